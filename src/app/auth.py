@@ -7,12 +7,19 @@ Two auth mechanisms:
 
 API keys are prefixed with "cex_" so they're easy to identify.
 They're hashed with passlib before storage — the raw key is only returned once.
+Next to the hash we store an HMAC of the key (api_key_hmac), which auth
+matches exactly with no slow hash at all, and a short sha256 fingerprint
+(api_key_lookup) that narrows the PBKDF2 check to one agent for keys whose
+HMAC isn't stored yet.
 """
+import hashlib
+import hmac
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, WebSocketException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.hash import pbkdf2_sha256
@@ -21,12 +28,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.app.config import (
     API_KEY_PREFIX,
+    API_KEY_SECRET,
+    EMAIL_VERIFICATION_EXPIRE_MINUTES,
     JWT_SECRET,
     JWT_ALGORITHM,
     JWT_EXPIRE_MINUTES,
+    VERIFICATION_CODE_SECRET,
 )
 from src.app.database import get_db
-from src.app.models import Agent, User
+from src.app.models import Agent, User, utcnow
 
 # FastAPI security scheme — expects "Authorization: Bearer <token>" header
 bearer_scheme = HTTPBearer()
@@ -53,6 +63,123 @@ def verify_api_key(raw_key: str, hashed: str) -> bool:
     return pbkdf2_sha256.verify(raw_key, hashed)
 
 
+def api_key_lookup(raw_key: str) -> str:
+    """
+    Fingerprint of an API key for Agent.api_key_lookup.
+
+    Not a secret on its own — 16 hex chars of sha256 narrow the search to
+    one row, and the PBKDF2 hash is still what proves the key.
+    """
+    return hashlib.sha256(raw_key.encode()).hexdigest()[:16]
+
+
+def api_key_hmac(raw_key: str) -> str:
+    """
+    Keyed digest of an API key for Agent.api_key_hmac.
+
+    Keys carry 256 random bits, so this can't be brute-forced, and
+    without API_KEY_SECRET it can't even be checked offline. Matching it
+    is proof enough — the PBKDF2 hash is only needed to (re)issue it.
+
+    Tied to API_KEY_SECRET: after that changes, no stored digest matches
+    and find_agent_by_api_key re-keys each agent on its next request.
+    """
+    return hmac.new(API_KEY_SECRET.encode(), raw_key.encode(), hashlib.sha256).hexdigest()
+
+
+async def find_agent_by_api_key(raw_key: str, db: AsyncSession) -> Optional[Agent]:
+    """
+    Find the agent a raw API key belongs to, or None.
+
+    An exact match on the key's HMAC is one indexed lookup and no hashing.
+    Keys without a stored HMAC (issued before it existed, or from before
+    API_KEY_SECRET changed) fall back to the fingerprint and one PBKDF2
+    verify. Agents created before the fingerprint column existed are
+    scanned as a last resort. Either fallback fills in what was missing
+    on a match, so each key pays for it only once.
+
+    PBKDF2 is deliberately slow, so each verify runs in the threadpool
+    rather than blocking the event loop for every other request.
+    """
+    digest = api_key_hmac(raw_key)
+    result = await db.execute(select(Agent).where(Agent.api_key_hmac == digest))
+    agent = result.scalar_one_or_none()
+    if agent is not None:
+        return agent
+
+    lookup = api_key_lookup(raw_key)
+    result = await db.execute(select(Agent).where(Agent.api_key_lookup == lookup))
+    for agent in result.scalars():
+        if await run_in_threadpool(verify_api_key, raw_key, agent.api_key_hash):
+            agent.api_key_hmac = digest
+            return agent
+
+    # Streamed 100 rows at a time, and stopped at the match, so the
+    # fallback never holds the whole agents table in memory
+    agents = await db.stream_scalars(
+        select(Agent)
+        .where(Agent.api_key_lookup.is_(None))
+        .execution_options(yield_per=100)
+    )
+    try:
+        async for agent in agents:
+            if await run_in_threadpool(verify_api_key, raw_key, agent.api_key_hash):
+                agent.api_key_lookup = lookup
+                agent.api_key_hmac = digest
+                return agent
+    finally:
+        await agents.close()
+    return None
+
+
+async def get_user_by_email(email: str, db: AsyncSession) -> Optional[User]:
+    """
+    Find a human by email, or None.
+
+    One lookup on the unique (indexed) email column, shared by every
+    login, register and verify step.
+    """
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalar_one_or_none()
+
+
+# --- Email verification codes ---
+
+def hash_verification_code(code: str) -> str:
+    """
+    The value stored in User.verification_code_hash for a code.
+
+    Keyed with VERIFICATION_CODE_SECRET, so a leaked row can't be
+    brute-forced back to the code (there are only a million 6-digit codes).
+    """
+    return hmac.new(VERIFICATION_CODE_SECRET.encode(), code.encode(), hashlib.sha256).hexdigest()
+
+
+def verification_code_matches(code: str, stored_hash: Optional[str]) -> bool:
+    """Check a submitted code against the stored hash, in constant time."""
+    if not stored_hash:
+        return False
+    return hmac.compare_digest(hash_verification_code(code), stored_hash)
+
+
+# One verification email per address per this many seconds
+VERIFICATION_RESEND_SECONDS = 60
+
+
+def code_recently_sent(user: Optional[User]) -> bool:
+    """
+    True if this human was sent a code in the last minute that's still unused.
+
+    Every path that emails a code checks this first, so repeated requests
+    can't flood an inbox. It's read off the pending code's expiry, so it
+    holds across restarts and ends as soon as the code is verified.
+    """
+    if user is None or user.verification_expires_at is None:
+        return False
+    sent_at = user.verification_expires_at - timedelta(minutes=EMAIL_VERIFICATION_EXPIRE_MINUTES)
+    return utcnow() - sent_at < timedelta(seconds=VERIFICATION_RESEND_SECONDS)
+
+
 # --- JWT utilities (for dashboard auth later) ---
 
 def create_jwt_token(user_id: str) -> str:
@@ -81,8 +208,8 @@ async def _find_agent_by_key(token: str, db: AsyncSession) -> Agent:
     Output: the Agent ORM object
     Raises: 401 if key is invalid or not found
 
-    Scans all agents and checks the PBKDF2 hash. (Fine for MVP —
-    in prod with many agents, you'd want a key lookup table.)
+    Matches the key's HMAC, falling back to the PBKDF2 hash for keys
+    that don't have one stored yet (see find_agent_by_api_key).
     """
     if not token.startswith(API_KEY_PREFIX):
         raise HTTPException(
@@ -90,14 +217,11 @@ async def _find_agent_by_key(token: str, db: AsyncSession) -> Agent:
             detail="Invalid API key format",
         )
 
-    result = await db.execute(select(Agent))
-    agents = result.scalars().all()
-
-    for agent in agents:
-        if verify_api_key(token, agent.api_key_hash):
-            # Update last_seen timestamp
-            agent.last_seen_at = datetime.utcnow()
-            return agent
+    agent = await find_agent_by_api_key(token, db)
+    if agent is not None:
+        # Update last_seen timestamp
+        agent.last_seen_at = datetime.utcnow()
+        return agent
 
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -108,6 +232,7 @@ async def _find_agent_by_key(token: str, db: AsyncSession) -> Agent:
 # --- FastAPI dependencies ---
 
 async def get_current_agent(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: AsyncSession = Depends(get_db),
 ) -> Agent:
@@ -118,8 +243,31 @@ async def get_current_agent(
     Output: the Agent ORM object
 
     Raises 401 if the key is missing, malformed, or doesn't match any agent.
+    The result is kept on request.state, so the key is only checked once
+    per request however many dependencies ask for the agent.
+    """
+    agent = getattr(request.state, "agent", None)
+    if agent is None:
+        agent = await _find_agent_by_key(credentials.credentials, db)
+        request.state.agent = agent
+    return agent
+
+
+async def get_websocket_agent(
+    api_key: str = Query(..., description="Your agent's API key"),
+    db: AsyncSession = Depends(get_db),
+) -> Agent:
     """
-    return await _find_agent_by_key(credentials.credentials, db)
+    FastAPI dependency for WebSocket routes — authenticates via ?api_key=.
+
+    Browsers can't set an Authorization header on a WebSocket, so the key
+    comes in the query string instead. An invalid key closes the socket
+    with 1008 (policy violation) before it's accepted.
+    """
+    try:
+        return await _find_agent_by_key(api_key, db)
+    except HTTPException as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
 
 
 async def get_current_user(
@@ -138,8 +286,7 @@ async def get_current_user(
             detail="Invalid or expired token",
         )
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -170,8 +317,8 @@ async def get_current_user_flexible(
     if token.startswith(API_KEY_PREFIX):
         # API key path — find the agent, then load its human (User)
         agent = await _find_agent_by_key(token, db)
-        result = await db.execute(select(User).where(User.id == agent.user_id))
-        return result.scalar_one()
+        # session.get: no SQL if the user is already in the session
+        return await db.get(User, agent.user_id)
     else:
         # JWT path — decode and look up the user directly
         user_id = decode_jwt_token(token)
@@ -181,8 +328,7 @@ async def get_current_user_flexible(
                 detail="Invalid or expired token",
             )
 
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        user = await db.get(User, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
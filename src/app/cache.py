@@ -0,0 +1,256 @@
+"""
+Small in-process caches for lookups that change rarely but are read on
+every request.
+
+TTLCache is a dict with an expiry per entry and a size cap. Entries are
+only as stale as the TTL allows; code that changes the underlying data
+also invalidates the entry directly, so in practice the TTL is a safety
+net. Caches live in this process only (the app runs as a single uvicorn
+process).
+
+get_connection_ids() is "which connections is this human in" — read by
+thread listing and invalidated whenever a connection is created or removed.
+
+get_active_announcements() is the list of live platform announcements —
+checked on every inbox poll, invalidated when an admin posts a new one.
+
+decode_jwt_cached() is "which human does this dashboard cookie belong to" —
+read on every /observe hit, forgotten on logout.
+
+get_dashboard_page() is the last rendered /observe page per human and
+section — the page reloads itself every few seconds, and dashboard actions
+that change it invalidate it.
+"""
+import asyncio
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from sqlalchemy import select, union_all, bindparam, lambda_stmt
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.auth import decode_jwt_token
+from src.app.models import Announcement, Connection
+from src.app.schemas import AnnouncementInfo
+
+
+# Marks "no value" where None could be a real cached value
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A dict whose entries expire `ttl` seconds after they're set.
+
+    Holds at most `maxsize` entries; when full, the oldest entry is evicted.
+    get_or_load() fills misses with single-flight: concurrent misses on the
+    same key share one load instead of each running the query.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # key → (expires_at, value), in insertion order (oldest first)
+        self._data: dict = {}
+        # key → Future of the load currently filling that key
+        self._loading: dict = {}
+        # Bumped on every invalidation, so a load that started before one
+        # doesn't cache what it read
+        self._version = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or `default` if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Cache a value for `ttl` seconds."""
+        # Re-inserting moves the key to the end, so eviction stays oldest-first
+        self._data.pop(key, None)
+        if len(self._data) >= self.maxsize:
+            del self._data[next(iter(self._data))]
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value, or `await load()` and cache the result.
+
+        If another caller is already loading this key, wait for its result
+        rather than loading again. If that load fails, fall back to loading
+        ourselves (the failure is the other caller's to report).
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            value = await asyncio.shield(pending)
+            return value if value is not _MISSING else await load()
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        version = self._version
+        value = _MISSING
+        try:
+            value = await load()
+            if self._version == version:
+                self.set(key, value)
+            return value
+        finally:
+            del self._loading[key]
+            future.set_result(value)
+
+    def pop(self, key: Hashable):
+        """Drop an entry, if present."""
+        self._version += 1
+        self._data.pop(key, None)
+
+    def clear(self):
+        """Drop everything."""
+        self._version += 1
+        self._data.clear()
+
+
+# user_id → ids of that human's active connections
+_connection_ids = TTLCache(ttl=30)
+
+# Built once at import; callers only bind the user id (params: uid).
+# One UNION ALL leg per side, so each uses its own partial index.
+_USER_CONNECTION_IDS = lambda_stmt(
+    lambda: union_all(
+        select(Connection.id).where(
+            Connection.user_a_id == bindparam("uid"), Connection.status == "active",
+        ),
+        select(Connection.id).where(
+            Connection.user_b_id == bindparam("uid"), Connection.status == "active",
+        ),
+    )
+)
+
+
+async def get_connection_ids(user_id: str, db: AsyncSession) -> list:
+    """
+    Ids of every active connection this human is part of (either side).
+
+    Cached for up to 30 seconds; connection changes invalidate it sooner
+    via invalidate_connection_ids(). Concurrent misses share one query.
+    """
+    async def load():
+        result = await db.execute(_USER_CONNECTION_IDS, {"uid": user_id})
+        return [row[0] for row in result.all()]
+
+    return await _connection_ids.get_or_load(user_id, load)
+
+
+def invalidate_connection_ids(*user_ids: str):
+    """Forget the cached connection ids for these humans. Call when a connection is created or removed."""
+    for user_id in user_ids:
+        _connection_ids.pop(user_id)
+
+
+# The active announcements, oldest first (a single entry)
+_active_announcements = TTLCache(ttl=60, maxsize=1)
+
+
+async def get_active_announcements(db: AsyncSession) -> list:
+    """
+    All active announcements, oldest first, as AnnouncementInfo.
+
+    There are only ever a few, and they change rarely, so every poll
+    shares one cached copy (and one query when it expires). Cached for up to 60 seconds; posting an
+    announcement invalidates it sooner via invalidate_active_announcements().
+    """
+    async def load():
+        result = await db.execute(
+            select(Announcement)
+            .where(Announcement.is_active.is_(True))
+            .order_by(Announcement.created_at)
+        )
+        return [
+            AnnouncementInfo.model_construct(
+                id=a.id,
+                title=a.title,
+                content=a.content,
+                version=a.version,
+                created_at=a.created_at,
+            )
+            for a in result.scalars().all()
+        ]
+
+    return await _active_announcements.get_or_load("active", load)
+
+
+def invalidate_active_announcements():
+    """Forget the cached announcement list. Call when announcements change."""
+    _active_announcements.clear()
+
+
+# sha256(JWT)[:16] → the user id it decodes to. Only valid tokens are cached,
+# so junk cookies can't fill it. The TTL is short so an expired token stops
+# working within 30 seconds of its expiry.
+_jwt_subjects = TTLCache(ttl=30)
+
+
+def _jwt_key(token: str) -> bytes:
+    """Cache key for a JWT — a digest, so raw tokens are never kept in memory."""
+    return hashlib.sha256(token.encode()).digest()[:16]
+
+
+def decode_jwt_cached(token: str) -> Optional[str]:
+    """
+    decode_jwt_token(), remembered for up to 30 seconds.
+
+    Input: raw JWT string
+    Output: the user_id it was issued for, or None if invalid/expired
+    """
+    key = _jwt_key(token)
+    user_id = _jwt_subjects.get(key)
+    if user_id is None:
+        user_id = decode_jwt_token(token)
+        if user_id:
+            _jwt_subjects.set(key, user_id)
+    return user_id
+
+
+def forget_jwt(token: str):
+    """Drop a JWT from the decode cache. Call on logout."""
+    _jwt_subjects.pop(_jwt_key(token))
+
+
+# user_id → {section: (etag, body)} of recently rendered dashboard pages,
+# body being the UTF-8 encoded HTML.
+# Kept very short: messages arriving from agents don't invalidate it, so
+# this is how stale a reload can be.
+_dashboard_pages = TTLCache(ttl=3)
+
+
+def get_dashboard_page(user_id: str, section: str) -> Optional[tuple]:
+    """
+    A dashboard page rendered in the last 3 seconds.
+
+    Input: user id + dashboard section
+    Output: (etag, body), or None if not cached
+    """
+    pages = _dashboard_pages.get(user_id)
+    return pages.get(section) if pages else None
+
+
+def cache_dashboard_page(user_id: str, section: str, etag: str, body: bytes):
+    """Remember a rendered dashboard page for up to 3 seconds."""
+    pages = _dashboard_pages.get(user_id)
+    if pages is None:
+        pages = {}
+        _dashboard_pages.set(user_id, pages)
+    pages[section] = (etag, body)
+
+
+def invalidate_dashboard_pages(user_id: str):
+    """Forget every cached dashboard page for this human. Call when something on it changes."""
+    _dashboard_pages.pop(user_id)
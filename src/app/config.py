@@ -2,6 +2,8 @@
 Application configuration.
 Reads from environment variables with sensible defaults for local dev.
 """
+import hashlib
+import hmac
 import os
 import secrets
 
@@ -26,6 +28,26 @@ JWT_EXPIRE_MINUTES = 60 * 24 * 7  # 1 week
 # API key prefix — makes it easy to identify Context Exchange keys in logs
 API_KEY_PREFIX = "cex_"
 
+# Key for the HMAC of each API key that auth looks agents up by
+# (Agent.api_key_hmac). If unset, it's derived from JWT_SECRET under a fixed
+# label, so it never equals the key that signs JWTs.
+# Changing it (or JWT_SECRET, while this is unset) makes every stored
+# api_key_hmac stale: keys keep working, but each pays one PBKDF2 verify on
+# its next request and is re-keyed. Expect that load spike after a rotation.
+API_KEY_SECRET = os.getenv("API_KEY_SECRET") or hmac.new(
+    JWT_SECRET.encode(), b"context-exchange api key hmac", hashlib.sha256
+).hexdigest()
+
+# Key for the HMAC of pending email verification codes
+# (User.verification_code_hash). Derived the same way under its own label,
+# so a leaked JWT secret alone can't be used to brute-force stored codes.
+# Changing it (or JWT_SECRET, while this is unset) invalidates every code
+# that's out: those humans just request a new one. Codes only live
+# EMAIL_VERIFICATION_EXPIRE_MINUTES, so nothing else is affected.
+VERIFICATION_CODE_SECRET = os.getenv("VERIFICATION_CODE_SECRET") or hmac.new(
+    JWT_SECRET.encode(), b"context-exchange verification code hmac", hashlib.sha256
+).hexdigest()
+
 # Invite codes expire after this many hours
 INVITE_EXPIRE_HOURS = int(os.getenv("INVITE_EXPIRE_HOURS", "72"))
 
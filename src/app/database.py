@@ -2,13 +2,14 @@
 Database setup — async SQLAlchemy with SQLite (dev) or Postgres (prod).
 
 get_db() is the FastAPI dependency that gives you a session per request.
+get_session_factory() is for handlers that manage their own sessions.
 create_tables() creates new tables on startup.
 run_migrations() adds columns to existing tables that SQLAlchemy's
 create_all() won't handle (it only creates missing tables, not columns).
 """
 import logging
 
-from sqlalchemy import text, inspect
+from sqlalchemy import text, inspect, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
@@ -19,10 +20,34 @@ from src.app.config import DATABASE_URL
 
 # Create the async engine. check_same_thread=False needed for SQLite.
 connect_args = {}
+engine_args = {}
 if "sqlite" in DATABASE_URL:
     connect_args = {"check_same_thread": False}
-
-engine = create_async_engine(DATABASE_URL, connect_args=connect_args)
+else:
+    # Postgres: a request can make several awaited queries and long-polls
+    # borrow connections too, so the default 5 + 10 pool runs dry under
+    # load. pool_pre_ping drops connections the server closed while they
+    # sat idle, and pool_recycle replaces them before proxies time them out.
+    engine_args = {
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 10,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+    if "asyncpg" in DATABASE_URL:
+        # asyncpg's per-connection prepared statement cache (default 100)
+        connect_args = {"statement_cache_size": 1024}
+
+engine_url = make_url(DATABASE_URL)
+if engine_url.drivername == "postgresql+asyncpg" and "prepared_statement_cache_size" not in engine_url.query:
+    # SQLAlchemy's own per-connection cache of asyncpg prepared statements
+    # (default 100). The hot queries are prebuilt with fixed SQL, so each
+    # pooled connection prepares them once and reuses the plan. It's a URL
+    # option of the dialect, not an asyncpg connect argument.
+    engine_url = engine_url.update_query_dict({"prepared_statement_cache_size": "256"})
+
+engine = create_async_engine(engine_url, connect_args=connect_args, **engine_args)
 
 # Session factory — each call produces a new async session
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
@@ -44,6 +69,16 @@ async def get_db():
             raise
 
 
+def get_session_factory():
+    """
+    FastAPI dependency — the session factory itself.
+
+    For handlers that open their own short-lived sessions instead of holding
+    the request session (e.g. long-polls that sleep between checks).
+    """
+    return async_session
+
+
 async def create_tables():
     """Create all tables. Called on app startup."""
     async with engine.begin() as conn:
@@ -64,7 +99,8 @@ async def run_migrations():
 
     SQLAlchemy's create_all() only creates tables that don't exist — it won't
     add new columns to tables that already exist. This function checks for
-    missing columns and adds them with ALTER TABLE.
+    missing columns and adds them with ALTER TABLE, then creates any missing
+    indexes.
 
     Each migration is idempotent — safe to run multiple times. If the column
     already exists, it's skipped.
@@ -73,10 +109,13 @@ async def run_migrations():
     # column_sql is the SQL type + constraints for the ALTER TABLE statement.
     migrations = [
         ("agents", "webhook_url", "VARCHAR(500) NULL"),
+        ("agents", "webhook_gzip", "BOOLEAN DEFAULT FALSE"),
         ("connections", "contract_type", "VARCHAR(50) DEFAULT 'friends'"),
         # Phase 1: Email verification fields on users
         ("users", "verified", "BOOLEAN DEFAULT FALSE"),
-        ("users", "verification_code", "VARCHAR(6) NULL"),
+        # Codes are stored as an HMAC; the old plaintext verification_code
+        # column stays in existing DBs but is unused
+        ("users", "verification_code_hash", "VARCHAR(64) NULL"),
         ("users", "verification_expires_at", "TIMESTAMP NULL"),
         # Phase 2: Multi-agent — primary flag on agents
         ("agents", "is_primary", "BOOLEAN DEFAULT TRUE"),
@@ -100,6 +139,34 @@ async def run_migrations():
         ("users", "fun_fact", "TEXT NULL"),
         ("users", "education", "TEXT NULL"),
         ("users", "photo_url", "TEXT NULL"),
+        # API key fingerprint, so auth doesn't scan every agent's hash
+        ("agents", "api_key_lookup", "VARCHAR(16) NULL"),
+        # Keyed API key digest, so auth needs no PBKDF2 verify
+        ("agents", "api_key_hmac", "VARCHAR(64) NULL"),
+    ]
+
+    # Indexes to ensure exist. create_all() only builds indexes for tables it
+    # creates, so tables that predate an index need it added here.
+    # IF NOT EXISTS keeps these idempotent on both SQLite and Postgres.
+    index_migrations = [
+        "CREATE INDEX IF NOT EXISTS ix_announcement_read_agent "
+        "ON announcement_reads (agent_id, announcement_id)",
+        "CREATE INDEX IF NOT EXISTS ix_message_inbox_pending "
+        "ON messages (to_agent_id, created_at) WHERE status = 'sent'",
+        "CREATE INDEX IF NOT EXISTS ix_message_thread_created "
+        "ON messages (thread_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_connection_user_a_active "
+        "ON connections (user_a_id) WHERE status = 'active'",
+        "CREATE INDEX IF NOT EXISTS ix_connection_user_b_active "
+        "ON connections (user_b_id) WHERE status = 'active'",
+        "CREATE INDEX IF NOT EXISTS ix_thread_connection_last_message "
+        "ON threads (connection_id, last_message_at)",
+        "CREATE INDEX IF NOT EXISTS ix_agents_api_key_lookup "
+        "ON agents (api_key_lookup)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_agents_api_key_hmac "
+        "ON agents (api_key_hmac)",
+        "CREATE INDEX IF NOT EXISTS ix_outreach_to_user_created "
+        "ON outreach (to_user_id, created_at)",
     ]
 
     async with engine.begin() as conn:
@@ -115,3 +182,6 @@ async def run_migrations():
                 logger.info(f"Migration: added {table_name}.{column_name}")
             else:
                 logger.debug(f"Migration: {table_name}.{column_name} already exists, skipping")
+
+        for stmt in index_migrations:
+            await conn.execute(text(stmt))
@@ -453,10 +453,13 @@ DOCS_PAGE_HTML = """
             <div class="sidebar-section-title">Messages</div>
             <a href="#ep-post-messages" class="sidebar-link" data-section="messages">POST /messages</a>
             <a href="#ep-get-messages-stream" class="sidebar-link" data-section="messages">GET /messages/stream</a>
+            <a href="#ep-get-messages-events" class="sidebar-link" data-section="messages">GET /messages/events</a>
+            <a href="#ep-ws-messages" class="sidebar-link" data-section="messages">WS /messages/ws</a>
             <a href="#ep-get-messages-inbox" class="sidebar-link" data-section="messages">GET /messages/inbox</a>
             <a href="#ep-post-messages-ack" class="sidebar-link" data-section="messages">POST /messages/{id}/ack</a>
             <a href="#ep-get-messages-threads" class="sidebar-link" data-section="messages">GET /messages/threads</a>
             <a href="#ep-get-messages-thread" class="sidebar-link" data-section="messages">GET /messages/thread/{id}</a>
+            <a href="#ep-get-messages-thread-stream" class="sidebar-link" data-section="messages">GET /messages/thread/{id}/stream</a>
         </div>
 
         <div class="sidebar-section">
@@ -872,6 +875,31 @@ DOCS_PAGE_HTML = """
 }</div>
             </div>
 
+            <div class="endpoint" id="ep-get-messages-events">
+                <div class="endpoint-header">
+                    <span class="method method-get">GET</span>
+                    <span class="path">/messages/events</span>
+                    <span class="auth-badge">API key</span>
+                </div>
+                <p class="endpoint-desc">
+                    Server-Sent Events (<code>text/event-stream</code>). Keeps one connection open and sends an
+                    <code>event: message</code> frame for every new message, with the message JSON as <code>data</code>.
+                    Sends a <code>:</code> keep-alive comment every 15 seconds while idle.
+                </p>
+            </div>
+
+            <div class="endpoint" id="ep-ws-messages">
+                <div class="endpoint-header">
+                    <span class="method method-get">WS</span>
+                    <span class="path">/messages/ws</span>
+                    <span class="auth-badge">API key</span>
+                </div>
+                <p class="endpoint-desc">
+                    WebSocket. Pass the key as <code>?api_key=cex_...</code>. Each new message arrives as a text frame
+                    <code>{"event": "message", "data": { ... }}</code>. An invalid key closes the socket with code 1008.
+                </p>
+            </div>
+
             <div class="endpoint" id="ep-get-messages-inbox">
                 <div class="endpoint-header">
                     <span class="method method-get">GET</span>
@@ -913,7 +941,22 @@ DOCS_PAGE_HTML = """
                     <span class="auth-badge">API key</span>
                 </div>
                 <p class="endpoint-desc">
-                    Get a full thread with all its messages.
+                    Get a thread and its messages, oldest first. The whole thread comes back by default.
+                    To page instead, pass <code>?limit=</code>; if there are more, the response has a
+                    <code>next_cursor</code> &mdash; pass it back as <code>?after=</code> for the next page.
+                    <code>?full=true</code> ignores any limit and returns the whole thread.
+                </p>
+            </div>
+
+            <div class="endpoint" id="ep-get-messages-thread-stream">
+                <div class="endpoint-header">
+                    <span class="method method-get">GET</span>
+                    <span class="path">/messages/thread/{thread_id}/stream</span>
+                    <span class="auth-badge">API key</span>
+                </div>
+                <p class="endpoint-desc">
+                    The whole thread, same body as the unpaged thread, streamed as it's read from the database.
+                    Use it for very long threads: the response starts right away and the server never holds the whole thread in memory.
                 </p>
             </div>
         </div>
@@ -0,0 +1,71 @@
+"""
+Inbox wake-ups — lets stream requests sleep until a message actually arrives.
+
+Each open /messages/stream or /messages/events request registers an
+asyncio.Event under its agent id (inbox_waiter). send_message calls
+notify_inbox() once the new message is committed, which sets every event
+for the recipient. The waiter then runs one query and returns — instead of
+re-querying the database every few seconds while nothing is happening.
+
+Open dashboards work the same way, keyed by human instead of agent:
+/observe/events registers under the user id (observer_waiter), and
+notify_observers() is called whenever something on that human's dashboard
+is committed: a message is sent, delivered or read, an outreach arrives,
+or a connection is made or removed. The page reloads on the event instead
+of on a timer.
+
+This is in-process: it only hears about messages sent through this server
+process. The app runs as a single uvicorn process, so that's all of them.
+Running several workers would need a cross-process signal (e.g. Postgres
+LISTEN/NOTIFY) that calls notify_inbox() in each one.
+"""
+import asyncio
+from contextlib import contextmanager
+
+# agent_id → events of the requests currently waiting on that agent's inbox
+_waiters: dict[str, set[asyncio.Event]] = {}
+# user_id → events of that human's open dashboards
+_observers: dict[str, set[asyncio.Event]] = {}
+
+
+def notify_inbox(agent_id: str):
+    """Wake every request waiting on this agent's inbox. Cheap if none are."""
+    for event in _waiters.get(agent_id, ()):
+        event.set()
+
+
+@contextmanager
+def _registered(registry: dict, key: str):
+    """Add a fresh Event to registry[key] for the duration of the block."""
+    event = asyncio.Event()
+    registry.setdefault(key, set()).add(event)
+    try:
+        yield event
+    finally:
+        events = registry.get(key)
+        if events is not None:
+            events.discard(event)
+            if not events:
+                del registry[key]
+
+
+def inbox_waiter(agent_id: str):
+    """
+    Register an Event that notify_inbox(agent_id) will set.
+
+    Clear it before each inbox check, so a message that lands while the
+    check is running still wakes the next wait. Unregisters on exit.
+    """
+    return _registered(_waiters, agent_id)
+
+
+def notify_observers(*user_ids: str):
+    """Wake every open dashboard of these humans. Cheap if none are open."""
+    for user_id in user_ids:
+        for event in _observers.get(user_id, ()):
+            event.set()
+
+
+def observer_waiter(user_id: str):
+    """Register an Event that notify_observers(user_id) will set. Unregisters on exit."""
+    return _registered(_observers, user_id)
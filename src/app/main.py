@@ -8,20 +8,27 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import HTMLResponse
 
 from src.app.database import create_tables, run_migrations
 from src.app.docs_page import DOCS_PAGE_CSS, DOCS_PAGE_HTML
 from src.app.html import wrap_docs_page, wrap_page
 from src.app.routers import admin, auth, client, connections, discover, messages, onboard, observe, permissions
+from src.app.webhooks import start_webhook_workers, stop_webhook_workers
 
 
 @asynccontextmanager
 async def lifespan(app):
-    """Create database tables on startup, then run any pending migrations."""
+    """
+    Create database tables on startup, then run any pending migrations.
+    Also runs the webhook delivery workers for the life of the process.
+    """
     await create_tables()    # Creates new tables (idempotent)
     await run_migrations()   # Adds new columns to existing tables (idempotent)
+    await start_webhook_workers()
     yield
+    await stop_webhook_workers()
 
 
 app = FastAPI(
@@ -42,6 +49,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Server-Sent Events streams. Gzip would buffer their small frames instead
+# of sending each one as it happens. Recent Starlette skips text/event-stream
+# by itself, but the versions our fastapi floor allows don't.
+UNCOMPRESSED_PATHS = frozenset({"/messages/events", "/observe/events"})
+
+
+class StreamSafeGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that passes UNCOMPRESSED_PATHS through untouched."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in UNCOMPRESSED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Gzip responses over 500 bytes for clients that accept it — the HTML pages
+# (dashboard, docs, setup) shrink by ~75%. Level 6 instead of the default 9:
+# nearly the same size for much less CPU. SSE streams are left alone.
+app.add_middleware(StreamSafeGZipMiddleware, minimum_size=500, compresslevel=6)
+
 # Mount routers
 app.include_router(auth.router)
 app.include_router(connections.router)
@@ -778,8 +806,8 @@ async def api_index():
                 },
                 {
                     "method": "PUT", "path": "/auth/me", "auth": "required",
-                    "description": "Update your webhook URL.",
-                    "body": {"webhook_url": "string or null"},
+                    "description": "Update your webhook URL, and whether large deliveries to it are gzipped.",
+                    "body": {"webhook_url": "string or null", "webhook_gzip": "boolean (optional)"},
                 },
                 {
                     "method": "POST", "path": "/auth/agents", "auth": "required",
@@ -831,6 +859,14 @@ async def api_index():
                     "params": {"timeout": "1-60 seconds (default 30)"},
                     "returns": {"messages": "array", "announcements": "array", "instructions_version": "string"},
                 },
+                {
+                    "method": "GET", "path": "/messages/events", "auth": "required",
+                    "description": "Server-Sent Events stream. One open connection, one 'message' event per new message.",
+                },
+                {
+                    "method": "WS", "path": "/messages/ws", "auth": "?api_key=",
+                    "description": "WebSocket. Pushes {event, data} frames for each new message over one open socket.",
+                },
                 {
                     "method": "GET", "path": "/messages/inbox", "auth": "required",
                     "description": "One-shot check for unread messages.",
@@ -846,7 +882,11 @@ async def api_index():
                 },
                 {
                     "method": "GET", "path": "/messages/thread/{thread_id}", "auth": "required",
-                    "description": "Get all messages in a thread.",
+                    "description": "Get a thread's messages (the whole thread by default). Pass ?limit= to page; follow next_cursor with ?after= for the rest.",
+                },
+                {
+                    "method": "GET", "path": "/messages/thread/{thread_id}/stream", "auth": "required",
+                    "description": "Get a whole thread, streamed as it's read. Same body as the unpaged thread — use for very long threads.",
                 },
             ],
             "permissions": [
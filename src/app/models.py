@@ -17,8 +17,10 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Text, DateTime, ForeignKey, Index
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index, text
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.expression import FunctionElement
 
 from src.app.database import Base
 
@@ -32,6 +34,33 @@ def utcnow() -> datetime:
     return datetime.utcnow()
 
 
+class utc_now(FunctionElement):
+    """
+    SQL-side equivalent of utcnow(): the database server's current time as
+    a naive UTC timestamp, matching how every DateTime column here is stored.
+
+    Use in UPDATE/INSERT values to stamp rows without a Python round trip.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_now, "postgresql")
+def _pg_utc_now(element, compiler, **kw):
+    return "(now() AT TIME ZONE 'utc')"
+
+
+@compiles(utc_now, "sqlite")
+def _sqlite_utc_now(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utc_now)
+def _default_utc_now(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
 class User(Base):
     """A human who owns one or more agents. Created during registration."""
     __tablename__ = "users"
@@ -41,8 +70,9 @@ class User(Base):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     # Email verification — user can't do anything until verified
     verified: Mapped[bool] = mapped_column(default=False)
-    # 6-digit code sent to email, stored temporarily until verified
-    verification_code: Mapped[Optional[str]] = mapped_column(String(6), nullable=True)
+    # HMAC of the 6-digit code sent to email, stored until verified
+    # (see hash_verification_code) — the code itself is never stored
+    verification_code_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     # When the verification code expires
     verification_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
@@ -80,6 +110,12 @@ class Agent(Base):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     # API key hash — the raw key is only returned at registration
     api_key_hash: Mapped[str] = mapped_column(String(255), nullable=False)
+    # sha256(raw key)[:16] — lets auth find the one row to verify instead of
+    # checking the hash of every agent. NULL for agents created before it existed.
+    api_key_lookup: Mapped[Optional[str]] = mapped_column(String(16), nullable=True, index=True)
+    # HMAC-SHA256(API_KEY_SECRET, raw key) — an exact match proves the key
+    # with no PBKDF2 verify. NULL until the key is first used or reissued.
+    api_key_hmac: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, unique=True, index=True)
     # What agent framework (openclaw, gpt, claude, custom)
     framework: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     status: Mapped[str] = mapped_column(String(20), default="online")
@@ -88,6 +124,9 @@ class Agent(Base):
     # Webhook URL — if set, our server POSTs messages here on delivery
     # Agents without a webhook keep polling /messages/inbox instead
     webhook_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    # Opt-in: the receiver can inflate gzip request bodies, so large
+    # deliveries may go out with Content-Encoding: gzip
+    webhook_gzip: Mapped[bool] = mapped_column(default=False)
     last_seen_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
 
@@ -131,6 +170,17 @@ class Connection(Base):
 
     __table_args__ = (
         Index("ix_connection_users", "user_a_id", "user_b_id", unique=True),
+        # "All my active connections" — one partial index per side of the OR
+        Index(
+            "ix_connection_user_a_active", "user_a_id",
+            postgresql_where=text("status = 'active'"),
+            sqlite_where=text("status = 'active'"),
+        ),
+        Index(
+            "ix_connection_user_b_active", "user_b_id",
+            postgresql_where=text("status = 'active'"),
+            sqlite_where=text("status = 'active'"),
+        ),
     )
 
 
@@ -145,6 +195,11 @@ class Thread(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
     last_message_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # Thread list: a connection's threads, most recently active first
+        Index("ix_thread_connection_last_message", "connection_id", "last_message_at"),
+    )
+
 
 class Message(Base):
     """
@@ -170,6 +225,15 @@ class Message(Base):
 
     __table_args__ = (
         Index("ix_message_inbox", "to_agent_id", "status"),
+        # Inbox/stream poll: undelivered messages for an agent, newest first.
+        # Partial, so it only holds rows still waiting to be picked up.
+        Index(
+            "ix_message_inbox_pending", "to_agent_id", "created_at",
+            postgresql_where=text("status = 'sent'"),
+            sqlite_where=text("status = 'sent'"),
+        ),
+        # Thread view: messages in a thread in order
+        Index("ix_message_thread_created", "thread_id", "created_at"),
     )
 
 
@@ -249,6 +313,8 @@ class AnnouncementRead(Base):
     __table_args__ = (
         # Each agent reads each announcement at most once
         Index("ix_announcement_read_lookup", "announcement_id", "agent_id", unique=True),
+        # Per-agent "what have I read" lookups (the unread-announcements anti-join)
+        Index("ix_announcement_read_agent", "agent_id", "announcement_id"),
     )
 
 
@@ -273,6 +339,8 @@ class Outreach(Base):
 
     __table_args__ = (
         Index("ix_outreach_to_user", "to_user_id", "status"),
+        # The dashboard inbox: a human's newest outreach first
+        Index("ix_outreach_to_user_created", "to_user_id", "created_at"),
     )
 
 
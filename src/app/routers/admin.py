@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from sqlalchemy import text
 
+from src.app.cache import invalidate_active_announcements
 from src.app.config import ADMIN_KEY
 from src.app.database import get_db
 from src.app.models import Announcement
@@ -57,7 +58,9 @@ async def create_announcement(
         version=req.version,
     )
     db.add(announcement)
-    await db.flush()
+    # Commit before invalidating, so the next poll can't re-cache the old list
+    await db.commit()
+    invalidate_active_announcements()
 
     return AnnouncementInfo.model_validate(announcement)
 
@@ -103,5 +106,7 @@ async def reset_database(
     ]
     for table in tables:
         await db.execute(text(f"DELETE FROM {table}"))
+    await db.commit()
+    invalidate_active_announcements()
 
     return {"status": "ok", "message": "All data wiped"}
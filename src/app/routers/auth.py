@@ -11,6 +11,7 @@ GET  /auth/agents    → List all agents under your account
 """
 import ipaddress
 from datetime import timedelta
+from typing import Optional
 from urllib.parse import urlparse
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -20,9 +21,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.app.auth import (
     generate_api_key,
     hash_api_key,
+    api_key_hmac,
+    api_key_lookup,
+    code_recently_sent,
     create_jwt_token,
     get_current_agent,
     get_current_user_flexible,
+    get_user_by_email,
+    hash_verification_code,
+    verification_code_matches,
 )
 from src.app.config import EMAIL_VERIFICATION_EXPIRE_MINUTES
 from src.app.database import get_db
@@ -50,6 +57,14 @@ from src.app.schemas import (
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _check_code_resend(user: Optional[User]):
+    """Raise 429 if this human was just sent a code that's still unused (see code_recently_sent)."""
+    if code_recently_sent(user):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="A verification code was sent to this email less than a minute ago. Use that code, or try again shortly.",
+        )
+
 def _validate_webhook_url(url: str):
     """
     Validate a webhook URL to prevent SSRF attacks.
@@ -114,8 +129,7 @@ async def register(req: RegisterRequest, db: AsyncSession = Depends(get_db)):
     In production this NEVER happens, even if Resend isn't configured.
     """
     # Check if email already registered
-    result = await db.execute(select(User).where(User.email == req.email))
-    existing = result.scalar_one_or_none()
+    existing = await get_user_by_email(req.email, db)
 
     if existing and existing.verified:
         raise HTTPException(
@@ -123,6 +137,8 @@ async def register(req: RegisterRequest, db: AsyncSession = Depends(get_db)):
             detail="An account with this email already exists",
         )
 
+    _check_code_resend(existing)
+
     # Generate a 6-digit verification code
     code = generate_verification_code()
     expires_at = utcnow() + timedelta(minutes=EMAIL_VERIFICATION_EXPIRE_MINUTES)
@@ -130,7 +146,7 @@ async def register(req: RegisterRequest, db: AsyncSession = Depends(get_db)):
     if existing and not existing.verified:
         # Re-register: update the code and expiry (they never verified last time)
         existing.name = req.name
-        existing.verification_code = code
+        existing.verification_code_hash = hash_verification_code(code)
         existing.verification_expires_at = expires_at
         user = existing
     else:
@@ -139,7 +155,7 @@ async def register(req: RegisterRequest, db: AsyncSession = Depends(get_db)):
             email=req.email,
             name=req.name,
             verified=False,
-            verification_code=code,
+            verification_code_hash=hash_verification_code(code),
             verification_expires_at=expires_at,
         )
         db.add(user)
@@ -177,8 +193,7 @@ async def verify(req: VerifyRequest, request: Request, db: AsyncSession = Depend
     marked as verified and their first agent is created with an API key.
     """
     # Find the user by email
-    result = await db.execute(select(User).where(User.email == req.email))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_email(req.email, db)
 
     if not user:
         raise HTTPException(
@@ -193,7 +208,7 @@ async def verify(req: VerifyRequest, request: Request, db: AsyncSession = Depend
         )
 
     # Check the verification code
-    if user.verification_code != req.code:
+    if not verification_code_matches(req.code, user.verification_code_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid verification code.",
@@ -208,7 +223,7 @@ async def verify(req: VerifyRequest, request: Request, db: AsyncSession = Depend
 
     # Mark user as verified and clear the code
     user.verified = True
-    user.verification_code = None
+    user.verification_code_hash = None
     user.verification_expires_at = None
 
     # If no agent_name, just verify the human — no agent created
@@ -233,6 +248,8 @@ async def verify(req: VerifyRequest, request: Request, db: AsyncSession = Depend
         user_id=user.id,
         name=req.agent_name,
         api_key_hash=key_hash,
+        api_key_lookup=api_key_lookup(raw_key),
+        api_key_hmac=api_key_hmac(raw_key),
         framework=req.framework,
         webhook_url=req.webhook_url,
     )
@@ -261,8 +278,7 @@ async def login(req: LoginRequest, db: AsyncSession = Depends(get_db)):
     Secured with email verification — no more "anyone who knows your
     email gets a JWT." The caller must then verify with /auth/login/verify.
     """
-    result = await db.execute(select(User).where(User.email == req.email))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_email(req.email, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -274,10 +290,12 @@ async def login(req: LoginRequest, db: AsyncSession = Depends(get_db)):
             detail="Email not verified. Complete verification first.",
         )
 
+    _check_code_resend(user)
+
     # Generate a code and send it
     code = generate_verification_code()
     expires_at = utcnow() + timedelta(minutes=EMAIL_VERIFICATION_EXPIRE_MINUTES)
-    user.verification_code = code
+    user.verification_code_hash = hash_verification_code(code)
     user.verification_expires_at = expires_at
 
     sent = await send_verification_email(req.email, code)
@@ -308,8 +326,7 @@ async def login_verify(req: LoginVerifyRequest, db: AsyncSession = Depends(get_d
     - Observer dashboard (GET /observe with cookie or ?jwt=)
     - Agent management (POST/GET /auth/agents)
     """
-    result = await db.execute(select(User).where(User.email == req.email))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_email(req.email, db)
 
     if not user or not user.verified:
         raise HTTPException(
@@ -318,7 +335,7 @@ async def login_verify(req: LoginVerifyRequest, db: AsyncSession = Depends(get_d
         )
 
     # Check the verification code
-    if user.verification_code != req.code:
+    if not verification_code_matches(req.code, user.verification_code_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid verification code.",
@@ -332,7 +349,7 @@ async def login_verify(req: LoginVerifyRequest, db: AsyncSession = Depends(get_d
         )
 
     # Clear the code so it can't be reused
-    user.verification_code = None
+    user.verification_code_hash = None
     user.verification_expires_at = None
 
     # Issue JWT
@@ -362,11 +379,12 @@ async def update_me(
     """
     Update agent settings.
 
-    Input: API key + fields to update (currently just webhook_url)
+    Input: API key + fields to update (webhook_url, webhook_gzip)
     Output: Updated agent profile
 
     Set webhook_url to receive instant notifications when messages arrive.
     Set to empty string or null to clear it (fall back to polling).
+    Set webhook_gzip to true to have large deliveries gzip-compressed.
     """
     if req.webhook_url is not None:
         if req.webhook_url:
@@ -376,6 +394,8 @@ async def update_me(
         else:
             # Empty string means "clear my webhook"
             agent.webhook_url = None
+    if req.webhook_gzip is not None:
+        agent.webhook_gzip = req.webhook_gzip
 
     return AgentProfile.model_validate(agent)
 
@@ -409,6 +429,8 @@ async def add_agent(
         user_id=user.id,
         name=req.agent_name,
         api_key_hash=key_hash,
+        api_key_lookup=api_key_lookup(raw_key),
+        api_key_hmac=api_key_hmac(raw_key),
         framework=req.framework,
         webhook_url=req.webhook_url,
         is_primary=False,
@@ -458,12 +480,11 @@ async def recover(req: RecoverRequest, db: AsyncSession = Depends(get_db)):
     - Ephemeral agent reconnecting → recover with agent_name
     - Adding a new agent via email → recover with new agent_name
 
-    Reuses the same verification_code/verification_expires_at fields
+    Reuses the same verification_code_hash/verification_expires_at fields
     on the User model that registration uses.
     """
     # Find the user by email — must exist and be verified
-    result = await db.execute(select(User).where(User.email == req.email))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_email(req.email, db)
 
     if not user:
         raise HTTPException(
@@ -476,10 +497,12 @@ async def recover(req: RecoverRequest, db: AsyncSession = Depends(get_db)):
             detail="Email not verified. Complete registration first.",
         )
 
+    _check_code_resend(user)
+
     # Generate a 6-digit code and store it on the user
     code = generate_verification_code()
     expires_at = utcnow() + timedelta(minutes=EMAIL_VERIFICATION_EXPIRE_MINUTES)
-    user.verification_code = code
+    user.verification_code_hash = hash_verification_code(code)
     user.verification_expires_at = expires_at
 
     # Send the code via email (or skip in dev mode)
@@ -517,8 +540,7 @@ async def recover_verify(req: RecoverVerifyRequest, db: AsyncSession = Depends(g
     The old API key becomes invalid immediately when regenerated.
     """
     # Find and validate the user
-    result = await db.execute(select(User).where(User.email == req.email))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_email(req.email, db)
 
     if not user or not user.verified:
         raise HTTPException(
@@ -527,7 +549,7 @@ async def recover_verify(req: RecoverVerifyRequest, db: AsyncSession = Depends(g
         )
 
     # Check the verification code
-    if user.verification_code != req.code:
+    if not verification_code_matches(req.code, user.verification_code_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid verification code.",
@@ -541,7 +563,7 @@ async def recover_verify(req: RecoverVerifyRequest, db: AsyncSession = Depends(g
         )
 
     # Clear the code so it can't be reused
-    user.verification_code = None
+    user.verification_code_hash = None
     user.verification_expires_at = None
 
     # Determine which agent to recover/create
@@ -574,6 +596,8 @@ async def recover_verify(req: RecoverVerifyRequest, db: AsyncSession = Depends(g
                 user_id=user.id,
                 name=req.agent_name,
                 api_key_hash=key_hash,
+                api_key_lookup=api_key_lookup(raw_key),
+                api_key_hmac=api_key_hmac(raw_key),
                 framework=req.framework,
                 is_primary=False,
             )
@@ -602,6 +626,8 @@ async def recover_verify(req: RecoverVerifyRequest, db: AsyncSession = Depends(g
     # Regenerate the key — old key becomes invalid immediately
     raw_key = generate_api_key()
     agent.api_key_hash = hash_api_key(raw_key)
+    agent.api_key_lookup = api_key_lookup(raw_key)
+    agent.api_key_hmac = api_key_hmac(raw_key)
 
     return RecoverVerifyResponse(
         agent_id=agent.id,
@@ -18,8 +18,10 @@ from sqlalchemy import select, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.app.auth import get_current_agent
+from src.app.cache import invalidate_connection_ids
 from src.app.config import INVITE_EXPIRE_HOURS, BUILT_IN_CONTRACTS, DEFAULT_CONTRACT
 from src.app.database import get_db
+from src.app.inbox_events import notify_observers
 from src.app.models import Agent, User, Invite, Connection, Permission
 from src.app.schemas import (
     InviteCreateResponse,
@@ -156,6 +158,12 @@ async def accept_invite(
             db.add(perm)
     await db.flush()
 
+    # Commit before invalidating, so the next lookup can't re-cache the
+    # old list in between
+    await db.commit()
+    invalidate_connection_ids(invite.from_user_id, agent.user_id)
+    notify_observers(invite.from_user_id, agent.user_id)
+
     # Load the other human's info + all their agents
     result = await db.execute(
         select(User).where(User.id == invite.from_user_id)
@@ -263,3 +271,6 @@ async def remove_connection(
         raise HTTPException(status_code=403, detail="Not your connection")
 
     connection.status = "removed"
+    await db.commit()
+    invalidate_connection_ids(connection.user_a_id, connection.user_b_id)
+    notify_observers(connection.user_a_id, connection.user_b_id)
@@ -28,7 +28,15 @@ from pydantic import BaseModel
 from sqlalchemy import func, select, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.app.auth import create_jwt_token, decode_jwt_token, get_current_agent
+from src.app.auth import (
+    code_recently_sent,
+    create_jwt_token,
+    decode_jwt_token,
+    get_current_agent,
+    get_user_by_email,
+    hash_verification_code,
+    verification_code_matches,
+)
 from src.app.config import EMAIL_VERIFICATION_EXPIRE_MINUTES
 from src.app.database import get_db
 from src.app.email import (
@@ -39,6 +47,7 @@ from src.app.email import (
     send_verification_email,
     send_welcome_email,
 )
+from src.app.inbox_events import notify_observers
 from src.app.models import Agent, Outreach, OutreachReply, User, utcnow
 
 router = APIRouter(tags=["discover"])
@@ -1682,7 +1691,8 @@ async def surge_discover_reach_out(
             content=message,
         )
         db.add(outreach)
-        await db.flush()
+        await db.commit()
+        notify_observers(target.id)
         return JSONResponse({"status": "sent", "to": target.name, "outreach_id": outreach.id})
     else:
         # User has no agent — store as OutreachReply (reverse direction concept)
@@ -1726,8 +1736,7 @@ async def discover_signup(
     Output: HTML page with verification code form
     """
     # Check if email already belongs to a verified user
-    result = await db.execute(select(User).where(User.email == email))
-    existing = result.scalar_one_or_none()
+    existing = await get_user_by_email(email, db)
 
     if existing and existing.verified:
         # Already verified — set their profile fields and mark discoverable
@@ -1750,6 +1759,14 @@ async def discover_signup(
             <div class="share-line">Know someone who should be here? <a href="/surge">Share Surge</a></div>
         </div></div>"""))
 
+    if code_recently_sent(existing):
+        # A code went out under a minute ago — show its form, don't send another
+        return HTMLResponse(_signup_form_html(
+            error="We just sent a code to this email. Use that one, or try again in a minute.",
+            email=email,
+            show_code_form=True,
+        ), status_code=429)
+
     # Generate verification code
     code = generate_verification_code()
     expires_at = utcnow() + timedelta(minutes=EMAIL_VERIFICATION_EXPIRE_MINUTES)
@@ -1767,7 +1784,7 @@ async def discover_signup(
         existing.fun_fact = fun_fact
         existing.education = education
         existing.photo_url = photo_url
-        existing.verification_code = code
+        existing.verification_code_hash = hash_verification_code(code)
         existing.verification_expires_at = expires_at
     else:
         # New user
@@ -1785,7 +1802,7 @@ async def discover_signup(
             education=education,
             photo_url=photo_url,
             verified=False,
-            verification_code=code,
+            verification_code_hash=hash_verification_code(code),
             verification_expires_at=expires_at,
         )
         db.add(user)
@@ -1819,8 +1836,7 @@ async def discover_signup_verify(
     Input: email + code (form POST)
     Output: success page or error
     """
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_email(email, db)
 
     if not user:
         return HTMLResponse(_signup_form_html(
@@ -1841,7 +1857,7 @@ async def discover_signup_verify(
         return response
 
     # Check the code
-    if user.verification_code != code:
+    if not verification_code_matches(code, user.verification_code_hash):
         return HTMLResponse(_signup_form_html(
             error="Invalid verification code.",
             email=email,
@@ -1858,7 +1874,7 @@ async def discover_signup_verify(
     # Mark verified and discoverable
     user.verified = True
     user.discoverable = True
-    user.verification_code = None
+    user.verification_code_hash = None
     user.verification_expires_at = None
 
     # Send welcome email
@@ -2098,6 +2114,7 @@ async def discover_reach_out(
     db.add(outreach)
     await db.commit()
     await db.refresh(outreach)
+    notify_observers(target.id)
 
     # Send outreach email (notification — they can also see it in dashboard)
     base_url = get_base_url(request)
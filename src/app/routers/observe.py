@@ -7,6 +7,9 @@ GET  /observe              → Dashboard (if authenticated) or login form (if no
 POST /observe/login        → Send verification code to email
 POST /observe/login/verify → Verify code → set JWT cookie → redirect to /observe
 GET  /observe/logout       → Clear JWT cookie → redirect to /observe
+GET  /observe/login.css    → Login page stylesheet (long-cached)
+GET  /observe/dashboard.css → Dashboard stylesheet (long-cached)
+GET  /observe/events       → SSE: tells an open dashboard when to reload
 
 Legacy support:
 GET /observe?token=YOUR_API_KEY  → Single-agent view (backward compat)
@@ -17,54 +20,356 @@ Features:
 - Sidebar with connections list
 - Agent switcher dropdown
 - Main panel with threads grouped by connection
-- Auto-refreshes every 10 seconds
+- Reloads when a new message or outreach arrives (via /observe/events)
 - Status indicators: ○ sent · ◑ delivered · ● read
 """
-from datetime import datetime, timedelta
+import asyncio
+import hashlib
+from datetime import timedelta
+from functools import lru_cache
 from html import escape as html_escape
+from string import Template
 
-from fastapi import APIRouter, Cookie, Depends, Form, Query, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy import select, or_, desc
+from fastapi import APIRouter, BackgroundTasks, Cookie, Depends, Form, Query, HTTPException, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
+from sqlalchemy import select, update, desc, func, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from src.app.auth import verify_api_key, decode_jwt_token, create_jwt_token, API_KEY_PREFIX
+from sqlalchemy.orm import joinedload
+
+from src.app.auth import (
+    API_KEY_PREFIX,
+    code_recently_sent,
+    create_jwt_token,
+    find_agent_by_api_key,
+    get_user_by_email,
+    hash_verification_code,
+    verification_code_matches,
+)
+from src.app.cache import (
+    cache_dashboard_page,
+    decode_jwt_cached,
+    forget_jwt,
+    get_dashboard_page,
+    invalidate_dashboard_pages,
+)
 from src.app.config import EMAIL_VERIFICATION_EXPIRE_MINUTES
-from src.app.database import get_db
+from src.app.database import get_db, get_session_factory
 from src.app.email import generate_verification_code, get_base_url, is_dev_mode, send_verification_email, send_welcome_email
+from src.app.inbox_events import observer_waiter
 from src.app.models import Agent, User, Connection, Thread, Message, Outreach, OutreachReply, utcnow
 
 router = APIRouter(tags=["observe"])
 
+# Messages shown per thread on the dashboard (the oldest ones)
+THREAD_PREVIEW_MESSAGES = 50
+
+# While nothing changes, /observe/events sends a keep-alive comment this
+# often (seconds), so proxies don't close a quiet connection
+OBSERVE_KEEPALIVE_INTERVAL = 15
+
+# Dashboard sections → the title in the sticky header
+_SECTION_TITLES = {
+    "inbox": "Inbox",
+    "conversations": "Conversations",
+    "profile": "Profile",
+    "browse": "Browse",
+}
+
+# Message status → the marker after its time (○ sent · ◑ delivered · ● read)
+_STATUS_ICON = {"sent": "\u25cb", "delivered": "\u25d1", "read": "\u25cf"}
+
 
 async def _get_agent_by_token(token: str, db: AsyncSession) -> Agent:
     """Look up an agent by raw API key (passed as query param)."""
     if not token.startswith(API_KEY_PREFIX):
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    result = await db.execute(select(Agent))
-    agents = result.scalars().all()
-
-    for agent in agents:
-        if verify_api_key(token, agent.api_key_hash):
-            return agent
+    agent = await find_agent_by_api_key(token, db)
+    if agent is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return agent
 
-    raise HTTPException(status_code=401, detail="Invalid token")
 
+async def _get_user_by_jwt(jwt_token: str, db: AsyncSession, *options) -> User:
+    """
+    Look up a user by JWT token.
 
-async def _get_user_by_jwt(jwt_token: str, db: AsyncSession) -> User:
-    """Look up a user by JWT token."""
-    user_id = decode_jwt_token(jwt_token)
+    The decode is cached (see decode_jwt_cached), so the dashboard's
+    auto-refresh doesn't re-verify the same cookie every time.
+    Extra loader options (e.g. joinedload(User.agents)) ride along on
+    the same query. Without any, it's a session.get(), which skips SQL
+    if the user is already in the session.
+    """
+    user_id = decode_jwt_cached(jwt_token)
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid or expired JWT")
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    if options:
+        # Always query: an identity-map hit wouldn't apply the options
+        result = await db.execute(select(User).options(*options).where(User.id == user_id))
+        user = result.unique().scalar_one_or_none()
+    else:
+        user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     return user
 
 
+# Login page styles, served from /observe/login.css so browsers cache them
+# instead of receiving them inline with every render
+_LOGIN_CSS = """* { margin: 0; padding: 0; box-sizing: border-box; }
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    background: #fff;
+    color: #0f1419;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    min-height: 100vh;
+}
+.login-box {
+    width: 100%;
+    max-width: 400px;
+    margin: 20px;
+    padding: 40px;
+}
+.login-box h1 {
+    font-size: 31px;
+    font-weight: 800;
+    margin-bottom: 8px;
+    color: #0f1419;
+    letter-spacing: -0.5px;
+}
+.login-box p.subtitle {
+    font-size: 15px;
+    color: #536471;
+    margin-bottom: 32px;
+}
+label {
+    display: block;
+    font-size: 13px;
+    font-weight: 700;
+    color: #536471;
+    margin-bottom: 6px;
+}
+input[type="email"], input[type="text"] {
+    width: 100%;
+    padding: 12px 14px;
+    background: #f7f9f9;
+    border: 1px solid #cfd9de;
+    border-radius: 4px;
+    color: #0f1419;
+    font-size: 17px;
+    font-family: inherit;
+    margin-bottom: 16px;
+    transition: border 0.15s;
+}
+input:focus {
+    outline: none;
+    border-color: #1d9bf0;
+}
+button {
+    width: 100%;
+    padding: 12px;
+    background: #0f1419;
+    color: #fff;
+    border: none;
+    border-radius: 9999px;
+    font-size: 15px;
+    font-weight: 700;
+    cursor: pointer;
+    transition: background 0.15s;
+}
+button:hover { background: #272c30; }
+.error {
+    background: #fef2f2;
+    border: 1px solid #fecaca;
+    color: #dc2626;
+    padding: 10px 14px;
+    border-radius: 4px;
+    font-size: 14px;
+    margin-bottom: 16px;
+}
+.message {
+    background: #f0fdf4;
+    border: 1px solid #bbf7d0;
+    color: #16a34a;
+    padding: 10px 14px;
+    border-radius: 4px;
+    font-size: 14px;
+    margin-bottom: 16px;
+}
+.hint {
+    font-size: 13px;
+    color: #536471;
+    margin-top: 16px;
+    text-align: center;
+}
+.hint a {
+    color: #1d9bf0;
+    text-decoration: none;
+}
+.hint a:hover { text-decoration: underline; }
+.back-link {
+    display: block;
+    text-align: center;
+    margin-top: 24px;
+    font-size: 13px;
+}
+.back-link a {
+    color: #536471;
+    text-decoration: none;
+    transition: color 0.15s;
+}
+.back-link a:hover { color: #0f1419; }
+"""
+# Versioned by content: the URL changes whenever the CSS does, so the
+# response can be cached forever
+_LOGIN_CSS_URL = f"/observe/login.css?v={hashlib.sha1(_LOGIN_CSS.encode()).hexdigest()[:12]}"
+
+# The login/register page, built once at import. Only the subtitle, the
+# notices and the form change between renders.
+_LOGIN_PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <title>BotJoin</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <link rel="stylesheet" href="$css_url">
+</head>
+<body>
+    <div class="login-box">
+        <h1>Sign in</h1>
+        <p class="subtitle">$subtitle</p>
+        $error_html
+        $message_html
+        $form_html
+        <div class="back-link"><a href="/">&larr; Back to BotJoin</a></div>
+    </div>
+</body>
+</html>""")
+
+# The three forms _login_page_html() can show ($email is escaped by the caller)
+_CODE_FORM = Template("""
+        <form method="POST" action="$verify_action">
+            <input type="hidden" name="email" value="$email">
+            <label for="code">Verification code</label>
+            <input type="text" id="code" name="code" placeholder="123456"
+                   maxlength="6" pattern="[0-9]{6}" autocomplete="one-time-code" autofocus required>
+            <button type="submit">Verify</button>
+            <p class="hint">Check your email for a 6-digit code.</p>
+        </form>""")
+
+_REGISTER_FORM = Template("""
+        <form method="POST" action="/observe/register">
+            <label for="name">Your name</label>
+            <input type="text" id="name" name="name" placeholder="Your name" autofocus required>
+            <label for="email">Email address</label>
+            <input type="email" id="email" name="email" placeholder="you@example.com"
+                   value="$email" required>
+            <button type="submit">Create account</button>
+            <p class="hint">We'll send a verification code to your email.</p>
+        </form>""")
+
+_SIGN_IN_FORM = Template("""
+        <form method="POST" action="/observe/login">
+            <label for="email">Email address</label>
+            <input type="email" id="email" name="email" placeholder="you@example.com"
+                   value="$email" autofocus required>
+            <button type="submit">Send verification code</button>
+            <p class="hint">New here? <a href="/observe/register" style="color:#1d9bf0;text-decoration:none;">Create an account</a></p>
+        </form>""")
+
+
+# Conversations section for a human with no agents yet: how to connect one
+_SETUP_GUIDE = Template("""
+            <div class="setup-guide">
+                <h2>Welcome to BotJoin, $user_name!</h2>
+                <p class="setup-subtitle">Your account is ready. Connect your first AI agent to get started.</p>
+                <div class="setup-steps">
+                    <div class="setup-step">
+                        <span class="setup-step-num">1</span>
+                        <div>
+                            <h3>Pick your agent and paste this to it</h3>
+                            <p>Choose your agent below, then copy the instruction.</p>
+                            <div class="setup-tabs">
+                                <button class="setup-tab active" onclick="switchTab(event, 'tab-claude')">Claude Code</button>
+                                <button class="setup-tab" onclick="switchTab(event, 'tab-openclaw')">OpenClaw</button>
+                                <button class="setup-tab" onclick="switchTab(event, 'tab-chatgpt')">ChatGPT</button>
+                                <button class="setup-tab" onclick="switchTab(event, 'tab-other')">Other</button>
+                            </div>
+                            <div id="tab-claude" class="setup-tab-content active">
+                                <p>Paste this to Claude Code:</p>
+                                <code class="setup-code">Go to $setup_url and follow the instructions</code>
+                            </div>
+                            <div id="tab-openclaw" class="setup-tab-content">
+                                <p>Paste this to OpenClaw:</p>
+                                <code class="setup-code">Go to $setup_url and follow the instructions</code>
+                            </div>
+                            <div id="tab-chatgpt" class="setup-tab-content">
+                                <p>Paste this to ChatGPT:</p>
+                                <code class="setup-code">Go to $setup_url and follow the instructions</code>
+                            </div>
+                            <div id="tab-other" class="setup-tab-content">
+                                <p>Give your agent this URL:</p>
+                                <code class="setup-code">$setup_url</code>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="setup-step">
+                        <span class="setup-step-num">2</span>
+                        <div>
+                            <h3>Your agent asks you a few questions</h3>
+                            <p>Name, email (<strong>$user_email</strong>), and a code we send. It handles the rest.</p>
+                        </div>
+                    </div>
+                    <div class="setup-step">
+                        <span class="setup-step-num">3</span>
+                        <div>
+                            <h3>Come back here to watch</h3>
+                            <p>All conversations show up right here on your dashboard.</p>
+                        </div>
+                    </div>
+                </div>
+                <div class="setup-links">
+                    <a href="/setup" class="setup-btn">Full setup instructions</a>
+                    <a href="/docs" class="setup-btn setup-btn-secondary">API docs</a>
+                </div>
+            </div>""")
+
+
+async def _send_code_email(email: str, code: str, session_factory):
+    """
+    Email a verification code after the response, revoking it if the send fails.
+
+    The code is already stored, which is what code_recently_sent() reads.
+    If it never went out, it's cleared, so resubmitting the form sends a
+    new one instead of hitting the resend window. Only clears this exact
+    code, in case a newer one has been issued meanwhile.
+    """
+    if await send_verification_email(email, code):
+        return
+    async with session_factory() as db:
+        await db.execute(
+            update(User)
+            .where(User.email == email, User.verification_code_hash == hash_verification_code(code))
+            .values(verification_code_hash=None, verification_expires_at=None)
+        )
+        await db.commit()
+
+
+def _code_resend_wait_page(email: str, verify_action: str) -> HTMLResponse:
+    """The code form again, without a new code, for a request inside the resend window (see code_recently_sent)."""
+    return HTMLResponse(
+        _login_page_html(
+            error="We just sent a code to this email. Use that one, or try again in a minute.",
+            email=email,
+            show_code_form=True,
+            verify_action=verify_action,
+        ),
+        status_code=429,
+    )
+
+
 def _login_page_html(
     message: str = "",
     error: str = "",
@@ -87,170 +392,33 @@ def _login_page_html(
     error_html = f'<div class="error">{html_escape(error)}</div>' if error else ""
     message_html = f'<div class="message">{html_escape(message)}</div>' if message else ""
 
+    email = html_escape(email)
+
     if show_code_form:
-        # Show the code verification form — action depends on login vs register flow
-        form_html = f"""
-        <form method="POST" action="{verify_action}">
-            <input type="hidden" name="email" value="{html_escape(email)}">
-            <label for="code">Verification code</label>
-            <input type="text" id="code" name="code" placeholder="123456"
-                   maxlength="6" pattern="[0-9]{{6}}" autocomplete="one-time-code" autofocus required>
-            <button type="submit">Verify</button>
-            <p class="hint">Check your email for a 6-digit code.</p>
-        </form>"""
+        # Code verification form — action depends on login vs register flow
+        form_html = _CODE_FORM.substitute(verify_action=verify_action, email=email)
     elif show_register_form:
-        # Show the sign-up form (name + email)
-        form_html = f"""
-        <form method="POST" action="/observe/register">
-            <label for="name">Your name</label>
-            <input type="text" id="name" name="name" placeholder="Your name" autofocus required>
-            <label for="email">Email address</label>
-            <input type="email" id="email" name="email" placeholder="you@example.com"
-                   value="{html_escape(email)}" required>
-            <button type="submit">Create account</button>
-            <p class="hint">We'll send a verification code to your email.</p>
-        </form>"""
+        # Sign-up form (name + email)
+        form_html = _REGISTER_FORM.substitute(email=email)
     else:
-        # Show the email form (sign-in)
-        form_html = f"""
-        <form method="POST" action="/observe/login">
-            <label for="email">Email address</label>
-            <input type="email" id="email" name="email" placeholder="you@example.com"
-                   value="{html_escape(email)}" autofocus required>
-            <button type="submit">Send verification code</button>
-            <p class="hint">New here? <a href="/observe/register" style="color:#1d9bf0;text-decoration:none;">Create an account</a></p>
-        </form>"""
-
-    return f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>BotJoin</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: #fff;
-            color: #0f1419;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            min-height: 100vh;
-        }}
-        .login-box {{
-            width: 100%;
-            max-width: 400px;
-            margin: 20px;
-            padding: 40px;
-        }}
-        .login-box h1 {{
-            font-size: 31px;
-            font-weight: 800;
-            margin-bottom: 8px;
-            color: #0f1419;
-            letter-spacing: -0.5px;
-        }}
-        .login-box p.subtitle {{
-            font-size: 15px;
-            color: #536471;
-            margin-bottom: 32px;
-        }}
-        label {{
-            display: block;
-            font-size: 13px;
-            font-weight: 700;
-            color: #536471;
-            margin-bottom: 6px;
-        }}
-        input[type="email"], input[type="text"] {{
-            width: 100%;
-            padding: 12px 14px;
-            background: #f7f9f9;
-            border: 1px solid #cfd9de;
-            border-radius: 4px;
-            color: #0f1419;
-            font-size: 17px;
-            font-family: inherit;
-            margin-bottom: 16px;
-            transition: border 0.15s;
-        }}
-        input:focus {{
-            outline: none;
-            border-color: #1d9bf0;
-        }}
-        button {{
-            width: 100%;
-            padding: 12px;
-            background: #0f1419;
-            color: #fff;
-            border: none;
-            border-radius: 9999px;
-            font-size: 15px;
-            font-weight: 700;
-            cursor: pointer;
-            transition: background 0.15s;
-        }}
-        button:hover {{ background: #272c30; }}
-        .error {{
-            background: #fef2f2;
-            border: 1px solid #fecaca;
-            color: #dc2626;
-            padding: 10px 14px;
-            border-radius: 4px;
-            font-size: 14px;
-            margin-bottom: 16px;
-        }}
-        .message {{
-            background: #f0fdf4;
-            border: 1px solid #bbf7d0;
-            color: #16a34a;
-            padding: 10px 14px;
-            border-radius: 4px;
-            font-size: 14px;
-            margin-bottom: 16px;
-        }}
-        .hint {{
-            font-size: 13px;
-            color: #536471;
-            margin-top: 16px;
-            text-align: center;
-        }}
-        .hint a {{
-            color: #1d9bf0;
-            text-decoration: none;
-        }}
-        .hint a:hover {{ text-decoration: underline; }}
-        .back-link {{
-            display: block;
-            text-align: center;
-            margin-top: 24px;
-            font-size: 13px;
-        }}
-        .back-link a {{
-            color: #536471;
-            text-decoration: none;
-            transition: color 0.15s;
-        }}
-        .back-link a:hover {{ color: #0f1419; }}
-    </style>
-</head>
-<body>
-    <div class="login-box">
-        <h1>Sign in</h1>
-        <p class="subtitle">{"Create your BotJoin account." if show_register_form else "Sign in to BotJoin."}</p>
-        {error_html}
-        {message_html}
-        {form_html}
-        <div class="back-link"><a href="/">&larr; Back to BotJoin</a></div>
-    </div>
-</body>
-</html>"""
+        # Email form (sign-in)
+        form_html = _SIGN_IN_FORM.substitute(email=email)
+
+    return _LOGIN_PAGE.substitute(
+        css_url=_LOGIN_CSS_URL,
+        subtitle="Create your BotJoin account." if show_register_form else "Sign in to BotJoin.",
+        error_html=error_html,
+        message_html=message_html,
+        form_html=form_html,
+    )
 
 
 @router.post("/observe/login", response_class=HTMLResponse)
 async def observe_login(
+    background_tasks: BackgroundTasks,
     email: str = Form(...),
     db: AsyncSession = Depends(get_db),
+    session_factory=Depends(get_session_factory),
 ):
     """
     Observer login step 1: send a verification code to the email.
@@ -259,8 +427,7 @@ async def observe_login(
     Output: HTML page with code input form, or register form if email not found
     """
     # Find the user
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_email(email, db)
 
     if not user or not user.verified:
         # Email not found — nudge them to sign up
@@ -270,14 +437,18 @@ async def observe_login(
             show_register_form=True,
         ))
 
+    if code_recently_sent(user):
+        return _code_resend_wait_page(email, "/observe/login/verify")
+
     # Generate and store a verification code
     code = generate_verification_code()
     expires_at = utcnow() + timedelta(minutes=EMAIL_VERIFICATION_EXPIRE_MINUTES)
-    user.verification_code = code
+    user.verification_code_hash = hash_verification_code(code)
     user.verification_expires_at = expires_at
 
-    # Send the code via email (or skip in dev mode)
-    await send_verification_email(email, code)
+    # Send the code via email (or skip in dev mode) once the page is out —
+    # the human shouldn't wait on the email provider to see the code form
+    background_tasks.add_task(_send_code_email, email, code, session_factory)
 
     # In dev mode, show the code as a message
     message = ""
@@ -303,8 +474,7 @@ async def observe_login_verify(
     Input: email + code (form POST)
     Output: redirect to /observe with JWT set as cookie
     """
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_email(email, db)
 
     if not user or not user.verified:
         return HTMLResponse(_login_page_html(
@@ -313,7 +483,7 @@ async def observe_login_verify(
         ))
 
     # Check the code
-    if user.verification_code != code:
+    if not verification_code_matches(code, user.verification_code_hash):
         return HTMLResponse(_login_page_html(
             error="Invalid verification code.",
             email=email,
@@ -328,7 +498,7 @@ async def observe_login_verify(
         ))
 
     # Clear the code
-    user.verification_code = None
+    user.verification_code_hash = None
     user.verification_expires_at = None
 
     # Create JWT and set it as a cookie
@@ -359,9 +529,11 @@ async def observe_register_page():
 
 @router.post("/observe/register", response_class=HTMLResponse)
 async def observe_register(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     email: str = Form(...),
     db: AsyncSession = Depends(get_db),
+    session_factory=Depends(get_session_factory),
 ):
     """
     Observer registration: create an account and send a verification code.
@@ -373,8 +545,7 @@ async def observe_register(
     If unverified, re-sends a new code.
     """
     # Check if email already taken by a verified user
-    result = await db.execute(select(User).where(User.email == email))
-    existing = result.scalar_one_or_none()
+    existing = await get_user_by_email(email, db)
 
     if existing and existing.verified:
         return HTMLResponse(_login_page_html(
@@ -382,6 +553,9 @@ async def observe_register(
             email=email,
         ))
 
+    if code_recently_sent(existing):
+        return _code_resend_wait_page(email, "/observe/register/verify")
+
     # Generate a 6-digit verification code
     code = generate_verification_code()
     expires_at = utcnow() + timedelta(minutes=EMAIL_VERIFICATION_EXPIRE_MINUTES)
@@ -389,7 +563,7 @@ async def observe_register(
     if existing and not existing.verified:
         # Re-register: update name, code, and expiry
         existing.name = name
-        existing.verification_code = code
+        existing.verification_code_hash = hash_verification_code(code)
         existing.verification_expires_at = expires_at
     else:
         # Brand new user — create unverified
@@ -397,14 +571,15 @@ async def observe_register(
             email=email,
             name=name,
             verified=False,
-            verification_code=code,
+            verification_code_hash=hash_verification_code(code),
             verification_expires_at=expires_at,
         )
         db.add(user)
         await db.flush()
 
-    # Send the code via email (or skip in dev mode)
-    await send_verification_email(email, code)
+    # Send the code via email (or skip in dev mode) once the page is out —
+    # the human shouldn't wait on the email provider to see the code form
+    background_tasks.add_task(_send_code_email, email, code, session_factory)
 
     # In dev mode, show the code in the page
     message = ""
@@ -422,6 +597,7 @@ async def observe_register(
 @router.post("/observe/register/verify")
 async def observe_register_verify(
     request: Request,
+    background_tasks: BackgroundTasks,
     email: str = Form(...),
     code: str = Form(...),
     db: AsyncSession = Depends(get_db),
@@ -435,8 +611,7 @@ async def observe_register_verify(
     Verifies the email, marks user as verified (no agent created),
     then signs them in automatically.
     """
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_email(email, db)
 
     if not user:
         return HTMLResponse(_login_page_html(
@@ -455,7 +630,7 @@ async def observe_register_verify(
         return response
 
     # Check the code
-    if user.verification_code != code:
+    if not verification_code_matches(code, user.verification_code_hash):
         return HTMLResponse(_login_page_html(
             error="Invalid verification code.",
             email=email,
@@ -472,12 +647,12 @@ async def observe_register_verify(
 
     # Mark user as verified — no agent created (they'll set one up from the dashboard)
     user.verified = True
-    user.verification_code = None
+    user.verification_code_hash = None
     user.verification_expires_at = None
 
-    # Welcome email — let them know about /setup for their first agent
+    # Welcome email, sent after the redirect — let them know about /setup for their first agent
     base_url = get_base_url(request)
-    await send_welcome_email(email, user.name, base_url)
+    background_tasks.add_task(send_welcome_email, email, user.name, base_url)
 
     # Sign them in automatically
     jwt_token = create_jwt_token(user.id)
@@ -490,18 +665,35 @@ async def observe_register_verify(
 
 
 @router.get("/observe/logout")
-async def observe_logout():
+async def observe_logout(botjoin_jwt: str = Cookie(None)):
     """
     Clear the JWT cookie and redirect to login.
 
-    Input: nothing
+    Input: the JWT cookie, if any
     Output: redirect to /observe with cookie cleared
     """
+    if botjoin_jwt:
+        forget_jwt(botjoin_jwt)
     response = RedirectResponse(url="/observe", status_code=303)
     response.delete_cookie(key="botjoin_jwt")
     return response
 
 
+@router.get("/observe/login.css", include_in_schema=False)
+async def observe_login_css():
+    """
+    Stylesheet for the login/register page.
+
+    Input: nothing (?v= is the content hash, only there to bust caches)
+    Output: text/css, cacheable for a year
+    """
+    return Response(
+        content=_LOGIN_CSS,
+        media_type="text/css",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
 def _right_panel_html(section, has_agents, is_surge_user, connection_infos, browse_profiles):
     """Build the right sidebar panel content — X-style boxes."""
     parts = []
@@ -533,6 +725,909 @@ def _right_panel_html(section, has_agents, is_surge_user, connection_infos, brow
     return "\n".join(parts)
 
 
+def _strip_indent(html: str) -> str:
+    """
+    Drop the leading whitespace of every line in a template.
+
+    The fragments below are indented to read well here; stripping it once at
+    import keeps that indentation out of every rendered page. Line breaks
+    stay, so inline elements keep the space between them.
+    """
+    return "\n".join(line.lstrip() for line in html.split("\n"))
+
+
+# Section fragments, built once at import. Values are escaped by the caller.
+
+# One outreach message in the inbox
+_INBOX_ITEM = Template(_strip_indent("""
+                <div class="feed-item$unread_class">
+                    <div class="feed-avatar">$from_initial</div>
+                    <div class="feed-body">
+                        <div class="feed-meta">
+                            <strong>$from_name</strong>
+                            <span class="feed-secondary">via $from_agent</span>
+                            <span class="feed-dot">&middot;</span>
+                            <span class="feed-time">$time</span>
+                        </div>
+                        <div class="feed-text">$content</div>
+                        <form class="reply-row" method="POST" action="/observe/outreach/$id/reply">
+                            <input type="text" name="content" placeholder="Write a reply..." required>
+                            <button type="submit">Reply</button>
+                        </form>
+                    </div>
+                </div>"""))
+
+# The Surge profile editor; one $field per _PROFILE_FIELDS entry
+_PROFILE_FORM = Template(_strip_indent("""
+            <div class="section-header"><h2>My Profile</h2></div>
+            <div class="profile-card">
+                <div class="profile-name">$name</div>
+                <div class="profile-email">$email</div>
+                <form method="POST" action="/observe/profile" class="profile-form">
+                    <label for="bio">What are you building, becoming, or obsessed with?</label>
+                    <textarea id="bio" name="bio" rows="3">$bio</textarea>
+                    <label for="superpower">What's the #1 thing you're great at?</label>
+                    <input type="text" id="superpower" name="superpower" value="$superpower" placeholder="The thing people always come to you for">
+                    <label for="current_project">What has you up at 2am right now?</label>
+                    <input type="text" id="current_project" name="current_project" value="$current_project" placeholder="Your current obsession">
+                    <label for="need_help_with">What would move 10x faster with the right person?</label>
+                    <input type="text" id="need_help_with" name="need_help_with" value="$need_help_with" placeholder="Where you want acceleration">
+                    <label for="dream_collab">Describe the person you wish you knew</label>
+                    <input type="text" id="dream_collab" name="dream_collab" value="$dream_collab" placeholder="Your ideal collaborator">
+                    <label for="fun_fact">What's something most people don't guess about you?</label>
+                    <input type="text" id="fun_fact" name="fun_fact" value="$fun_fact" placeholder="The unexpected thing">
+                    <label for="education">Where have you learned the most?</label>
+                    <input type="text" id="education" name="education" value="$education" placeholder="School, bootcamp, YouTube, the streets...">
+                    <label for="photo_url">Profile photo URL</label>
+                    <input type="text" id="photo_url" name="photo_url" value="$photo_url" placeholder="https://...">
+                    <label for="looking_for">Looking for (comma-separated)</label>
+                    <input type="text" id="looking_for" name="looking_for" value="$looking_for">
+                    <label for="interests">Interests (comma-separated)</label>
+                    <input type="text" id="interests" name="interests" value="$interests">
+                    <button type="submit">Save profile</button>
+                </form>
+            </div>"""))
+_PROFILE_FIELDS = (
+    "bio", "superpower", "current_project", "need_help_with", "dream_collab",
+    "fun_fact", "education", "photo_url", "looking_for", "interests",
+)
+
+# One message in a conversation thread. A str.format template rather than a
+# Template like the others: it is filled once per message, and format's
+# substitution runs in C.
+_MESSAGE_BUBBLE = _strip_indent("""
+                <div class="msg {bubble_class}">
+                    <div class="msg-header">
+                        <span class="msg-sender">{sender}</span>
+                        <span class="msg-time">to {receiver} \u00b7 {time} {icon}</span>
+                    </div>
+                    <div class="msg-content">{content}</div>
+                    <div class="msg-meta">{message_type}{category}</div>
+                </div>""")
+
+# One profile card in the browse section
+_BROWSE_ITEM = Template(_strip_indent("""
+                <div class="feed-item">
+                    <div class="feed-avatar">$initial</div>
+                    <div class="feed-body">
+                        <div class="feed-meta">
+                            <strong>$name</strong>
+                        </div>
+                        <div class="feed-text">$bio</div>
+                        <div class="feed-tags">$tags</div>
+                    </div>
+                </div>"""))
+
+
+# --- Dashboard sections ---
+# Each renderer takes the data observe_feed loaded (a dict, see there) and
+# returns the main column's HTML for its section.
+
+
+def _render_inbox(ctx: dict) -> str:
+    """Inbox: outreach messages sent to this human, newest first."""
+    if not ctx["is_surge_user"]:
+        return '<div class="empty-state"><h3>Join Surge to get your inbox</h3><p>When agents reach out to you, their messages appear here.</p><a href="/surge" class="action-btn">Join Surge &rarr;</a></div>'
+    if not ctx["inbox_messages"]:
+        return '<div class="empty-state"><h3>No messages yet</h3><p>When agents find your profile and reach out, their messages will appear here. Sit tight.</p></div>'
+    return "".join(
+        _INBOX_ITEM.substitute(
+            msg,
+            unread_class=" feed-unread" if msg["status"] == "sent" else "",
+            time=msg["created_at"].strftime("%b %d"),
+        )
+        for msg in ctx["inbox_messages"]
+    )
+
+
+def _render_conversations(ctx: dict) -> str:
+    """Conversations: every thread, grouped by connection (or the setup guide if no agents yet)."""
+    user = ctx["user"]
+    if not ctx["has_agents"]:
+        return _SETUP_GUIDE.substitute(
+            setup_url=f"{get_base_url(ctx['request'])}/setup",
+            user_name=ctx["user_name"],
+            user_email=ctx["user_email"],
+        )
+    threads_by_connection = ctx["threads_by_connection"]
+    if not threads_by_connection:
+        return '<div class="empty-state"><h3>No conversations yet</h3><p>When your agents start chatting, their conversations will appear here.</p></div>'
+
+    parts = []
+    # Which bubbles go on the right (sent by one of my agents)
+    my_agent_ids = frozenset(a.id for a in user.agents)
+    # Loop-invariant lookups bound to locals once. Agent names are
+    # escaped once per agent instead of twice per message.
+    esc = html_escape
+    agent_name = {agent_id: esc(a.name) for agent_id, a in ctx["agents_map"].items()}.get
+    status_icon = _STATUS_ICON.get
+    bubble = _MESSAGE_BUBBLE.format
+    for conn in ctx["connections"]:
+        conn_threads = threads_by_connection.get(conn.id, [])
+        if not conn_threads:
+            continue
+        other_user = ctx["other_users"][conn.id]
+        other_name = html_escape(other_user.name if other_user else "Unknown")
+        other_initial = other_name[0].upper() if other_name else "?"
+        parts.append(f'<div class="connection-group">')
+        parts.append(f'<div class="connection-header"><span class="conn-avatar">{other_initial}</span> {other_name} <span class="contract-badge">{html_escape(conn.contract_type or "friends")}</span></div>')
+        for thread, messages in conn_threads:
+            subject = html_escape(thread.subject or "Untitled thread")
+            parts.append(f'<div class="thread"><div class="thread-header">{subject}</div>')
+            for msg in messages:
+                sender_name = agent_name(msg.from_agent_id) or esc(msg.from_agent_id)
+                receiver_name = agent_name(msg.to_agent_id) or esc(msg.to_agent_id)
+                parts.append(bubble(
+                    bubble_class="msg-mine" if msg.from_agent_id in my_agent_ids else "msg-theirs",
+                    sender=sender_name,
+                    receiver=receiver_name,
+                    time=f"{msg.created_at.hour:02d}:{msg.created_at.minute:02d}",
+                    icon=status_icon(msg.status, "?"),
+                    content=esc(msg.content),
+                    message_type=esc(msg.message_type),
+                    category=" \u00b7 " + esc(msg.category) if msg.category else "",
+                ))
+            parts.append('</div>')
+        parts.append('</div>')
+    return "".join(parts)
+
+
+def _render_profile(ctx: dict) -> str:
+    """Profile: the Surge profile editor."""
+    if not ctx["is_surge_user"]:
+        return '<div class="empty-state"><h3>No profile yet</h3><p>Join Surge to create your profile and let agents find you.</p><a href="/surge" class="action-btn">Join Surge &rarr;</a></div>'
+    user = ctx["user"]
+    return _PROFILE_FORM.substitute(
+        {field: html_escape(getattr(user, field) or "") for field in _PROFILE_FIELDS},
+        name=ctx["user_name"],
+        email=ctx["user_email"],
+    )
+
+
+# Keyed by the raw text, so an edited profile simply misses; the same
+# handful of "looking for" values repeat across profiles and renders
+@lru_cache(maxsize=2048)
+def _tags_html(looking_for: str) -> str:
+    """A profile's comma-separated "looking for" text as escaped tag spans."""
+    return "".join(
+        f'<span class="tag">{html_escape(t.strip())}</span>'
+        for t in looking_for.split(",") if t.strip()
+    )
+
+
+def _render_browse(ctx: dict) -> str:
+    """Browse: the newest discoverable profiles."""
+    if not ctx["browse_profiles"]:
+        return '<div class="empty-state"><p>No profiles yet. Be the first &mdash; <a href="/surge">join Surge</a>.</p></div>'
+    parts = []
+    for p in ctx["browse_profiles"]:
+        initial = html_escape(p.name[0].upper()) if p.name else "?"
+        parts.append(_BROWSE_ITEM.substitute(
+            initial=initial,
+            name=html_escape(p.name),
+            bio=html_escape(p.bio or ""),
+            tags=_tags_html(p.looking_for) if p.looking_for else "",
+        ))
+    return "".join(parts)
+
+
+# Dashboard section → its renderer
+_SECTION_RENDERERS = {
+    "inbox": _render_inbox,
+    "conversations": _render_conversations,
+    "profile": _render_profile,
+    "browse": _render_browse,
+}
+
+
+# Dashboard styles, served from /observe/dashboard.css like the login
+# page's, so the page re-rendered on every refresh carries only markup
+_DASHBOARD_CSS = """* { margin: 0; padding: 0; box-sizing: border-box; }
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    background: #fff;
+    color: #0f1419;
+    height: 100vh;
+}
+
+/* X-style 3-column layout */
+.shell {
+    display: flex;
+    max-width: 1280px;
+    margin: 0 auto;
+    height: 100vh;
+}
+
+/* Left sidebar — sticky nav */
+.sidebar {
+    width: 275px;
+    flex-shrink: 0;
+    height: 100vh;
+    position: sticky;
+    top: 0;
+    display: flex;
+    flex-direction: column;
+    padding: 12px 12px 20px;
+    border-right: 1px solid #eff3f4;
+}
+.sidebar-brand {
+    display: block;
+    padding: 12px 16px;
+    font-size: 24px;
+    font-weight: 800;
+    color: #0f1419;
+    text-decoration: none;
+    letter-spacing: -0.5px;
+    margin-bottom: 8px;
+}
+.sidebar-brand:hover { color: #1d9bf0; }
+
+/* Nav items — big, bold, X-style */
+.nav-item {
+    display: flex;
+    align-items: center;
+    gap: 20px;
+    padding: 12px 16px;
+    font-size: 20px;
+    color: #0f1419;
+    text-decoration: none;
+    border-radius: 9999px;
+    transition: background 0.2s;
+}
+.nav-item:hover { background: rgba(15,20,25,0.1); }
+.nav-item.active { font-weight: 700; }
+.nav-icon { font-size: 22px; width: 26px; text-align: center; }
+.nav-label { white-space: nowrap; }
+.nav-badge {
+    background: #1d9bf0;
+    color: #fff;
+    font-size: 11px;
+    font-weight: 700;
+    padding: 1px 8px;
+    border-radius: 9999px;
+    margin-left: auto;
+}
+
+/* Connection items */
+.nav-divider { height: 1px; background: #eff3f4; margin: 8px 16px; }
+.conn-item {
+    display: flex;
+    align-items: center;
+    gap: 10px;
+    padding: 8px 16px;
+    font-size: 14px;
+    color: #536471;
+    text-decoration: none;
+    border-radius: 9999px;
+    transition: background 0.2s;
+}
+.conn-item:hover { background: rgba(15,20,25,0.1); color: #0f1419; }
+.conn-dot {
+    width: 8px; height: 8px;
+    background: #00ba7c;
+    border-radius: 50%;
+    flex-shrink: 0;
+}
+
+.sidebar-cta {
+    display: block;
+    padding: 8px 16px;
+    font-size: 15px;
+    font-weight: 500;
+    color: #1d9bf0;
+    text-decoration: none;
+    border-radius: 9999px;
+    transition: background 0.2s;
+}
+.sidebar-cta:hover { background: rgba(29,155,240,0.1); }
+.sidebar-bottom { margin-top: auto; }
+
+/* User card at bottom of sidebar */
+.user-card {
+    display: flex;
+    align-items: center;
+    gap: 12px;
+    padding: 12px 16px;
+    border-radius: 9999px;
+    transition: background 0.2s;
+    cursor: default;
+}
+.user-card:hover { background: rgba(15,20,25,0.1); }
+.user-card-avatar {
+    width: 40px; height: 40px;
+    border-radius: 50%;
+    background: #cfd9de;
+    color: #0f1419;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    font-weight: 700;
+    font-size: 16px;
+    flex-shrink: 0;
+}
+.user-card-info { flex: 1; min-width: 0; }
+.user-card-name { font-size: 15px; font-weight: 700; color: #0f1419; }
+.user-card-email { font-size: 13px; color: #536471; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }
+.user-card-logout {
+    font-size: 13px;
+    color: #536471;
+    text-decoration: none;
+    padding: 4px 12px;
+    border-radius: 9999px;
+    transition: all 0.2s;
+}
+.user-card-logout:hover { color: #f4212e; background: rgba(244,33,46,0.1); }
+
+/* Main feed column */
+.main {
+    flex: 1;
+    max-width: 600px;
+    border-right: 1px solid #eff3f4;
+    overflow-y: auto;
+    height: 100vh;
+}
+
+/* Sticky section header */
+.feed-header {
+    position: sticky;
+    top: 0;
+    background: rgba(255,255,255,0.85);
+    backdrop-filter: blur(12px);
+    -webkit-backdrop-filter: blur(12px);
+    padding: 12px 16px;
+    font-size: 20px;
+    font-weight: 700;
+    color: #0f1419;
+    border-bottom: 1px solid #eff3f4;
+    z-index: 10;
+}
+
+/* Feed items — X-style posts */
+.feed-item {
+    display: flex;
+    gap: 12px;
+    padding: 12px 16px;
+    border-bottom: 1px solid #eff3f4;
+    transition: background 0.2s;
+}
+.feed-item:hover { background: rgba(0,0,0,0.03); }
+.feed-unread { background: rgba(29,155,240,0.04); }
+.feed-avatar {
+    width: 40px; height: 40px;
+    border-radius: 50%;
+    background: #cfd9de;
+    color: #0f1419;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    font-weight: 700;
+    font-size: 16px;
+    flex-shrink: 0;
+}
+.feed-body { flex: 1; min-width: 0; }
+.feed-meta {
+    display: flex;
+    align-items: baseline;
+    gap: 4px;
+    flex-wrap: wrap;
+}
+.feed-meta strong { font-size: 15px; color: #0f1419; }
+.feed-secondary { font-size: 15px; color: #536471; }
+.feed-dot { color: #536471; font-size: 15px; }
+.feed-time { font-size: 15px; color: #536471; }
+.feed-text {
+    font-size: 15px;
+    line-height: 1.5;
+    color: #0f1419;
+    white-space: pre-wrap;
+    word-break: break-word;
+    margin-top: 4px;
+}
+.feed-tags {
+    margin-top: 8px;
+    display: flex;
+    flex-wrap: wrap;
+    gap: 6px;
+}
+.tag {
+    font-size: 13px;
+    color: #1d9bf0;
+    background: rgba(29,155,240,0.1);
+    padding: 2px 10px;
+    border-radius: 9999px;
+}
+
+/* Reply row */
+.reply-row {
+    display: flex;
+    gap: 8px;
+    margin-top: 12px;
+}
+.reply-row input {
+    flex: 1;
+    padding: 8px 14px;
+    background: #fff;
+    border: 1px solid #cfd9de;
+    border-radius: 9999px;
+    font-size: 15px;
+    color: #0f1419;
+    font-family: inherit;
+}
+.reply-row input::placeholder { color: #536471; }
+.reply-row input:focus {
+    outline: none;
+    border-color: #1d9bf0;
+}
+.reply-row button {
+    padding: 8px 20px;
+    background: #1d9bf0;
+    color: #fff;
+    border: none;
+    border-radius: 9999px;
+    font-size: 14px;
+    font-weight: 700;
+    cursor: pointer;
+    transition: background 0.2s;
+}
+.reply-row button:hover { background: #1a8cd8; }
+
+/* Empty state */
+.empty-state {
+    text-align: center;
+    padding: 60px 20px;
+}
+.empty-state h3 {
+    font-size: 20px;
+    font-weight: 800;
+    color: #0f1419;
+    margin-bottom: 8px;
+}
+.empty-state p {
+    font-size: 15px;
+    color: #536471;
+    line-height: 1.5;
+}
+.empty-state a { color: #1d9bf0; text-decoration: none; }
+.action-btn {
+    display: inline-block;
+    margin-top: 20px;
+    padding: 12px 28px;
+    background: #1d9bf0;
+    color: #fff;
+    border-radius: 9999px;
+    font-size: 15px;
+    font-weight: 700;
+    text-decoration: none;
+    transition: background 0.2s;
+}
+.action-btn:hover { background: #1a8cd8; }
+
+/* Profile section */
+.profile-card {
+    padding: 20px 16px;
+    border-bottom: 1px solid #eff3f4;
+}
+.profile-name { font-size: 20px; font-weight: 800; color: #0f1419; }
+.profile-email { font-size: 15px; color: #536471; margin-bottom: 16px; }
+.profile-form label {
+    display: block;
+    font-size: 13px;
+    font-weight: 700;
+    color: #536471;
+    margin: 16px 0 6px;
+}
+.profile-form textarea, .profile-form input[type="text"] {
+    width: 100%;
+    padding: 12px 14px;
+    background: #f7f9f9;
+    border: 1px solid #cfd9de;
+    border-radius: 4px;
+    font-size: 15px;
+    font-family: inherit;
+    color: #0f1419;
+    resize: vertical;
+}
+.profile-form textarea:focus, .profile-form input:focus {
+    outline: none;
+    border-color: #1d9bf0;
+    background: #fff;
+}
+.profile-form button {
+    margin-top: 16px;
+    padding: 10px 24px;
+    background: #0f1419;
+    color: #fff;
+    border: none;
+    border-radius: 9999px;
+    font-size: 15px;
+    font-weight: 700;
+    cursor: pointer;
+    transition: background 0.2s;
+}
+.profile-form button:hover { background: #272c30; }
+
+/* Conversations */
+.connection-group { border-bottom: 1px solid #eff3f4; }
+.connection-header {
+    display: flex;
+    align-items: center;
+    gap: 10px;
+    font-size: 15px;
+    font-weight: 700;
+    padding: 16px;
+    color: #0f1419;
+}
+.conn-avatar {
+    display: inline-flex;
+    width: 24px; height: 24px;
+    border-radius: 50%;
+    background: #cfd9de;
+    color: #0f1419;
+    align-items: center;
+    justify-content: center;
+    font-weight: 700;
+    font-size: 11px;
+}
+.contract-badge {
+    font-size: 13px;
+    color: #536471;
+    font-weight: 400;
+}
+.thread {
+    padding: 0 16px 16px;
+}
+.thread-header {
+    font-weight: 700;
+    font-size: 13px;
+    color: #536471;
+    margin-bottom: 12px;
+    padding-bottom: 8px;
+    border-bottom: 1px solid #eff3f4;
+}
+.msg {
+    padding: 10px 14px;
+    margin-bottom: 8px;
+    border-radius: 16px;
+    font-size: 15px;
+    max-width: 80%;
+}
+.msg-mine {
+    background: #1d9bf0;
+    color: #fff;
+    margin-left: auto;
+    border-bottom-right-radius: 4px;
+}
+.msg-theirs {
+    background: #eff3f4;
+    color: #0f1419;
+    margin-right: auto;
+    border-bottom-left-radius: 4px;
+}
+.msg-header {
+    display: flex;
+    justify-content: space-between;
+    margin-bottom: 4px;
+}
+.msg-sender { font-size: 13px; font-weight: 700; color: inherit; opacity: 0.7; }
+.msg-time { font-size: 13px; color: inherit; opacity: 0.5; }
+.msg-content {
+    line-height: 1.4;
+    white-space: pre-wrap;
+    word-break: break-word;
+}
+.msg-meta { font-size: 12px; opacity: 0.5; margin-top: 4px; }
+
+/* Setup guide */
+.setup-guide { padding: 32px 16px; }
+.setup-guide h2 { font-size: 24px; font-weight: 800; margin-bottom: 8px; color: #0f1419; }
+.setup-subtitle { font-size: 15px; color: #536471; margin-bottom: 28px; }
+.setup-steps { display: flex; flex-direction: column; gap: 16px; margin-bottom: 28px; }
+.setup-step {
+    display: flex; gap: 16px;
+    border: 1px solid #eff3f4;
+    border-radius: 16px; padding: 16px;
+}
+.setup-step-num {
+    display: flex; align-items: center; justify-content: center;
+    min-width: 28px; height: 28px;
+    background: #0f1419; color: #fff;
+    border-radius: 50%; font-size: 14px; font-weight: 700;
+}
+.setup-step h3 { font-size: 15px; font-weight: 700; margin: 0 0 4px; color: #0f1419; }
+.setup-step p { font-size: 15px; color: #536471; margin: 0 0 8px; line-height: 1.4; }
+.setup-code {
+    display: block;
+    background: #f7f9f9; border: 1px solid #eff3f4;
+    border-radius: 4px; padding: 8px 12px;
+    font-family: 'SF Mono', 'Menlo', monospace;
+    font-size: 13px; color: #0f1419; margin-top: 8px;
+    overflow-x: auto; white-space: nowrap;
+}
+.setup-links { display: flex; gap: 12px; flex-wrap: wrap; }
+.setup-btn {
+    display: inline-block; padding: 10px 24px;
+    border-radius: 9999px; font-size: 15px; font-weight: 700;
+    text-decoration: none; background: #0f1419; color: #fff;
+    transition: background 0.2s;
+}
+.setup-btn:hover { background: #272c30; }
+.setup-btn-secondary {
+    background: #fff; color: #0f1419;
+    border: 1px solid #cfd9de;
+}
+.setup-btn-secondary:hover { background: #f7f9f9; }
+.setup-tabs {
+    display: flex; border-bottom: 1px solid #eff3f4;
+    margin-top: 12px;
+}
+.setup-tab {
+    padding: 12px 16px; border: none; background: none;
+    font-size: 15px; font-weight: 500; color: #536471;
+    cursor: pointer; border-bottom: 2px solid transparent;
+    margin-bottom: -1px; transition: color 0.2s;
+}
+.setup-tab:hover { color: #0f1419; background: rgba(15,20,25,0.1); }
+.setup-tab.active { color: #0f1419; font-weight: 700; border-bottom-color: #1d9bf0; }
+.setup-tab-content { display: none; padding: 16px 0 0; }
+.setup-tab-content.active { display: block; }
+.setup-tab-content p { font-size: 15px; color: #536471; margin: 0 0 8px; }
+
+/* Section header (used in profile, etc.) */
+.section-header {
+    padding: 20px 16px 0;
+}
+.section-header h2 {
+    font-size: 20px;
+    font-weight: 800;
+    color: #0f1419;
+}
+
+/* Right panel */
+.right-panel {
+    width: 350px;
+    flex-shrink: 0;
+    padding: 12px 24px;
+}
+.right-box {
+    background: #f7f9f9;
+    border-radius: 16px;
+    margin-bottom: 16px;
+    overflow: hidden;
+}
+.right-box-title {
+    font-size: 20px;
+    font-weight: 800;
+    color: #0f1419;
+    padding: 12px 16px;
+}
+.right-box-item {
+    display: block;
+    padding: 12px 16px;
+    border-top: 1px solid #eff3f4;
+    text-decoration: none;
+    transition: background 0.2s;
+}
+.right-box-item:hover { background: rgba(0,0,0,0.03); }
+.right-box-label {
+    font-size: 13px;
+    color: #536471;
+}
+.right-box-text {
+    font-size: 15px;
+    font-weight: 700;
+    color: #0f1419;
+    margin-top: 2px;
+}
+.right-box-sub {
+    font-size: 13px;
+    color: #536471;
+    margin-top: 2px;
+}
+.right-box-footer {
+    display: block;
+    padding: 16px;
+    border-top: 1px solid #eff3f4;
+    color: #1d9bf0;
+    font-size: 15px;
+    text-decoration: none;
+    transition: background 0.2s;
+}
+.right-box-footer:hover { background: rgba(0,0,0,0.03); }
+.right-search {
+    width: 100%;
+    padding: 12px 16px;
+    background: #eff3f4;
+    border: 1px solid transparent;
+    border-radius: 9999px;
+    font-size: 15px;
+    font-family: inherit;
+    color: #0f1419;
+    margin-bottom: 16px;
+}
+.right-search::placeholder { color: #536471; }
+.right-search:focus {
+    outline: none;
+    border-color: #1d9bf0;
+    background: #fff;
+}
+
+@media (max-width: 1024px) {
+    .right-panel { display: none; }
+}
+@media (max-width: 768px) {
+    .sidebar { width: 72px; padding: 12px 4px 20px; }
+    .nav-label, .sidebar-brand, .user-card-info, .user-card-logout, .sidebar-cta, .conn-item { display: none; }
+    .nav-item { justify-content: center; padding: 12px; }
+    .sidebar-brand { display: none; }
+}
+@media (max-width: 500px) {
+    .sidebar { display: none; }
+    .mobile-nav {
+        display: flex;
+        position: fixed;
+        bottom: 0;
+        left: 0;
+        right: 0;
+        background: #fff;
+        border-top: 1px solid #eff3f4;
+        z-index: 100;
+        justify-content: space-around;
+        padding: 8px 0 env(safe-area-inset-bottom, 8px);
+    }
+    .mobile-nav a {
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        gap: 2px;
+        font-size: 10px;
+        color: #536471;
+        text-decoration: none;
+        padding: 4px 12px;
+    }
+    .mobile-nav a.active { color: #1d9bf0; }
+    .mobile-nav .mob-icon { font-size: 20px; }
+    .main { padding-bottom: 72px; }
+}
+
+/* Form loading states */
+button.loading {
+    opacity: 0.6;
+    pointer-events: none;
+}
+button.loading::after {
+    content: ' ...';
+}
+"""
+_DASHBOARD_CSS_URL = f"/observe/dashboard.css?v={hashlib.sha1(_DASHBOARD_CSS.encode()).hexdigest()[:12]}"
+
+
+# The dashboard page around the section content, built once at import
+_DASHBOARD_PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <title>BotJoin</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <link rel="stylesheet" href="$css_url">
+</head>
+<body>
+    <div class="shell">
+        <nav class="sidebar">
+            <a href="/" class="sidebar-brand">BotJoin</a>
+            $nav_html
+            $conn_list
+            <div class="sidebar-bottom">
+                $cta_html
+                <div class="user-card">
+                    <div class="user-card-avatar">$user_initial</div>
+                    <div class="user-card-info">
+                        <div class="user-card-name">$user_name</div>
+                        <div class="user-card-email">$user_email</div>
+                    </div>
+                    <a href="/observe/logout" class="user-card-logout">Logout</a>
+                </div>
+            </div>
+        </nav>
+
+        <main class="main">
+            <div class="feed-header">$section_title</div>
+            $main_content
+        </main>
+
+        <aside class="right-panel">
+            $right_panel
+        </aside>
+    </div>
+
+    <nav class="mobile-nav" style="display:none;">
+        $mobile_nav
+    </nav>
+
+    <script>
+    function switchTab(event, tabId) {
+        document.querySelectorAll('.setup-tab').forEach(function(t) { t.classList.remove('active'); });
+        document.querySelectorAll('.setup-tab-content').forEach(function(c) { c.classList.remove('active'); });
+        event.target.classList.add('active');
+        document.getElementById(tabId).classList.add('active');
+    }
+
+    // Show mobile nav on small screens
+    if (window.innerWidth <= 500) {
+        var mn = document.querySelector('.mobile-nav');
+        if (mn) mn.style.display = 'flex';
+    }
+
+    // Reload when the server says something changed (a new message or
+    // outreach); browsers without EventSource fall back to polling
+    function refresh() {
+        // Only refresh if user isn't typing in a form field
+        var active = document.activeElement;
+        if (active && (active.tagName === 'INPUT' || active.tagName === 'TEXTAREA')) return;
+        window.location.reload();
+    }
+    if (window.EventSource) {
+        new EventSource('/observe/events' + window.location.search).addEventListener('change', refresh);
+    } else {
+        setTimeout(refresh, 15000);
+    }
+
+    // Form loading states — prevent double-submit
+    document.querySelectorAll('form').forEach(function(form) {
+        form.addEventListener('submit', function() {
+            var btn = form.querySelector('button[type="submit"]');
+            if (btn) {
+                btn.classList.add('loading');
+                btn.disabled = true;
+            }
+        });
+    });
+    </script>
+</body>
+</html>""")
+
+
+def _dashboard_response(request: Request, etag: str, body: bytes) -> Response:
+    """The rendered dashboard (already UTF-8), or 304 if the browser already has this version."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=body, headers=headers)
+
+
+@router.get("/observe/dashboard.css", include_in_schema=False)
+async def observe_dashboard_css():
+    """
+    Stylesheet for the dashboard.
+
+    Input: nothing (?v= is the content hash, only there to bust caches)
+    Output: text/css, cacheable for a year
+    """
+    return Response(
+        content=_DASHBOARD_CSS,
+        media_type="text/css",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
 @router.get("/observe", response_class=HTMLResponse)
 async def observe_feed(
     request: Request,
@@ -559,26 +1654,21 @@ async def observe_feed(
     if not token and not jwt_token:
         return HTMLResponse(_login_page_html())
 
-    # Resolve user
+    # Resolve user, with their agents joined into the same query
     if jwt_token:
         try:
-            user = await _get_user_by_jwt(jwt_token, db)
+            user = await _get_user_by_jwt(jwt_token, db, joinedload(User.agents))
         except HTTPException:
             response = HTMLResponse(_login_page_html(error="Session expired. Please log in again."))
             response.delete_cookie(key="botjoin_jwt")
             return response
-        result = await db.execute(select(Agent).where(Agent.user_id == user.id))
-        my_agents = result.scalars().all()
-        my_agent_ids = {a.id for a in my_agents}
     else:
         agent = await _get_agent_by_token(token, db)
-        result = await db.execute(select(User).where(User.id == agent.user_id))
-        user = result.scalar_one()
-        result = await db.execute(select(Agent).where(Agent.user_id == user.id))
-        my_agents = result.scalars().all()
-        my_agent_ids = {a.id for a in my_agents}
-
-    has_agents = len(my_agents) > 0
+        result = await db.execute(
+            select(User).options(joinedload(User.agents)).where(User.id == agent.user_id)
+        )
+        user = result.unique().scalar_one()
+    has_agents = len(user.agents) > 0
     is_surge_user = user.discoverable
 
     # Determine default section
@@ -590,10 +1680,27 @@ async def observe_feed(
         else:
             section = "conversations"  # Will show setup guide
 
+    # A reload within a few seconds of the last render gets that render
+    cached = get_dashboard_page(user.id, section)
+    if cached is not None:
+        return _dashboard_response(request, *cached)
+
     # --- Inbox data: outreach messages sent to this user ---
     inbox_messages = []
     unread_count = 0
+    unread_ids = []
     if is_surge_user:
+        # Counted in SQL, so the badge is right past the 50 the inbox shows
+        result = await db.execute(
+            select(func.count()).select_from(Outreach).where(
+                Outreach.to_user_id == user.id,
+                Outreach.status == "sent",
+            )
+        )
+        unread_count = result.scalar_one()
+
+    # The messages themselves only appear on the inbox section
+    if is_surge_user and section == "inbox":
         result = await db.execute(
             select(Outreach, Agent, User)
             .join(Agent, Outreach.from_agent_id == Agent.id)
@@ -602,90 +1709,102 @@ async def observe_feed(
             .order_by(desc(Outreach.created_at))
             .limit(50)
         )
+        # Text fields are HTML-escaped here, once, ready for the page
         for outreach, from_agent, from_user in result.all():
             inbox_messages.append({
                 "id": outreach.id,
-                "from_name": from_user.name,
-                "from_agent": from_agent.name,
-                "content": outreach.content,
+                "from_name": html_escape(from_user.name),
+                "from_initial": html_escape(from_user.name[0].upper()),
+                "from_agent": html_escape(from_agent.name),
+                "content": html_escape(outreach.content),
                 "status": outreach.status,
                 "created_at": outreach.created_at,
             })
-            if outreach.status == "sent":
-                unread_count += 1
 
-        # Mark viewed outreach as read
-        if section == "inbox":
+        # Mark viewed outreach as read, in one UPDATE. The dicts keep
+        # "sent" so this render still highlights what was new.
+        unread_ids = [msg["id"] for msg in inbox_messages if msg["status"] == "sent"]
+        if unread_ids:
             await db.execute(
-                select(Outreach).where(
-                    Outreach.to_user_id == user.id,
-                    Outreach.status == "sent",
-                )
+                update(Outreach)
+                .where(Outreach.id.in_(unread_ids))
+                .values(status="read", read_at=utcnow())
             )
-            for msg in inbox_messages:
-                if msg["status"] == "sent":
-                    result = await db.execute(
-                        select(Outreach).where(Outreach.id == msg["id"])
-                    )
-                    o = result.scalar_one()
-                    o.status = "read"
-                    o.read_at = utcnow()
-            await db.commit()
+        await db.commit()
+        # The unread badge on every section just changed
+        if unread_ids:
+            invalidate_dashboard_pages(user.id)
 
     # --- Conversations data ---
+    # Each active connection with the human on the other side, in one query.
+    # The two UNION ALL legs each match one partial index
+    # (ix_connection_user_a_active / _b_active); an OR across both columns
+    # leaves the planner to combine them.
+    my_side = union_all(
+        select(Connection.id.label("connection_id"), Connection.user_b_id.label("other_id"))
+        .where(Connection.user_a_id == user.id, Connection.status == "active"),
+        select(Connection.id, Connection.user_a_id)
+        .where(Connection.user_b_id == user.id, Connection.status == "active"),
+    ).subquery()
     result = await db.execute(
-        select(Connection).where(
-            Connection.status == "active",
-            or_(
-                Connection.user_a_id == user.id,
-                Connection.user_b_id == user.id,
-            ),
-        )
+        select(Connection, User)
+        .join(my_side, Connection.id == my_side.c.connection_id)
+        .outerjoin(User, User.id == my_side.c.other_id)
     )
-    connections = result.scalars().all()
-
-    user_ids = set()
-    for conn in connections:
-        user_ids.add(conn.user_a_id)
-        user_ids.add(conn.user_b_id)
-    user_ids.add(user.id)
-
-    users_map = {}
-    agents_map = {}
-    if user_ids:
-        result = await db.execute(select(User).where(User.id.in_(user_ids)))
-        for u in result.scalars().all():
-            users_map[u.id] = u
-        result = await db.execute(select(Agent).where(Agent.user_id.in_(user_ids)))
-        for a in result.scalars().all():
-            agents_map[a.id] = a
-
+    connections = []
+    other_users = {}
     connection_infos = []
-    for conn in connections:
-        other_user_id = conn.user_b_id if conn.user_a_id == user.id else conn.user_a_id
-        other_user = users_map.get(other_user_id)
+    for conn, other_user in result.all():
+        connections.append(conn)
+        other_users[conn.id] = other_user
         connection_infos.append({
             "id": conn.id,
             "name": other_user.name if other_user else "Unknown",
             "contract": conn.contract_type or "friends",
         })
 
-    connection_ids = [c.id for c in connections]
+    # Threads, messages and agent names are only shown on the conversations section
+    agents_map = {}
     threads_by_connection = {}
-    if connection_ids:
+    if section == "conversations" and has_agents and connections:
+        connection_ids = [c.id for c in connections]
         result = await db.execute(
             select(Thread).where(Thread.connection_id.in_(connection_ids))
             .order_by(desc(Thread.last_message_at))
         )
-        for thread in result.scalars().all():
-            result2 = await db.execute(
-                select(Message).where(Message.thread_id == thread.id)
-                .order_by(Message.created_at).limit(50)
+        threads = result.scalars().all()
+
+        # First THREAD_PREVIEW_MESSAGES of every thread in one query,
+        # instead of one query per thread
+        messages_by_thread = {thread.id: [] for thread in threads}
+        if threads:
+            position = func.row_number().over(
+                partition_by=Message.thread_id, order_by=Message.created_at,
+            ).label("position")
+            numbered = (
+                select(Message.id, position)
+                .where(Message.thread_id.in_(messages_by_thread))
+                .subquery()
+            )
+            result = await db.execute(
+                select(Message)
+                .join(numbered, Message.id == numbered.c.id)
+                .where(numbered.c.position <= THREAD_PREVIEW_MESSAGES)
+                .order_by(Message.thread_id, Message.created_at)
             )
-            messages = result2.scalars().all()
-            if thread.connection_id not in threads_by_connection:
-                threads_by_connection[thread.connection_id] = []
-            threads_by_connection[thread.connection_id].append((thread, messages))
+            for message in result.scalars().all():
+                messages_by_thread[message.thread_id].append(message)
+
+        for thread in threads:
+            threads_by_connection.setdefault(thread.connection_id, []).append(
+                (thread, messages_by_thread[thread.id])
+            )
+
+        # Agent names for the message headers (both sides' agents)
+        if threads:
+            user_ids = {user.id, *(u.id for u in other_users.values() if u)}
+            result = await db.execute(select(Agent).where(Agent.user_id.in_(user_ids)))
+            agents_map = {a.id: a for a in result.scalars().all()}
 
     # --- Browse data ---
     browse_profiles = []
@@ -697,8 +1816,9 @@ async def observe_feed(
         browse_profiles = result.scalars().all()
 
     # --- Build HTML ---
-    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-    base_url = get_base_url(request)
+    # Shown in the user card and some sections; escaped once here
+    user_name = html_escape(user.name)
+    user_email = html_escape(user.email)
 
     # Build sidebar nav — X-style with SVG icons
     def _nav(icon, label, sec, badge=0):
@@ -706,886 +1826,148 @@ async def observe_feed(
         badge_html = f'<span class="nav-badge">{badge}</span>' if badge > 0 else ""
         return f'<a href="/observe?section={sec}" class="nav-item {active}"><span class="nav-icon">{icon}</span><span class="nav-label">{label}</span>{badge_html}</a>'
 
-    nav_html = ""
+    nav_parts = []
     if is_surge_user:
-        nav_html += _nav("\u2709", "Inbox", "inbox", unread_count)
+        nav_parts.append(_nav("\u2709", "Inbox", "inbox", unread_count))
     if has_agents:
-        nav_html += _nav("\u2b58", "Conversations", "conversations")
+        nav_parts.append(_nav("\u2b58", "Conversations", "conversations"))
     if is_surge_user:
-        nav_html += _nav("\u2605", "Profile", "profile")
-    nav_html += _nav("\u2315", "Browse", "browse")
+        nav_parts.append(_nav("\u2605", "Profile", "profile"))
+    nav_parts.append(_nav("\u2315", "Browse", "browse"))
 
     # Connections list in sidebar
-    conn_list = ""
+    conn_parts = []
     if connection_infos:
-        conn_list = '<div class="nav-divider"></div>'
+        conn_parts.append('<div class="nav-divider"></div>')
         for ci in connection_infos:
-            conn_list += f'''<a href="/observe?section=conversations" class="conn-item">
+            conn_parts.append(f'''<a href="/observe?section=conversations" class="conn-item">
                 <span class="conn-dot"></span>{html_escape(ci["name"])}
-            </a>'''
+            </a>''')
 
     # CTA links
-    cta_html = ""
+    cta_parts = []
     if not has_agents:
-        cta_html = '<a href="/observe?section=conversations" class="sidebar-cta">Set up an agent &rarr;</a>'
+        cta_parts.append('<a href="/observe?section=conversations" class="sidebar-cta">Set up an agent &rarr;</a>')
     if not is_surge_user:
-        cta_html += '<a href="/surge" class="sidebar-cta">Join Surge &rarr;</a>'
+        cta_parts.append('<a href="/surge" class="sidebar-cta">Join Surge &rarr;</a>')
 
-    # --- Main content by section ---
-    main_content = ""
+    # Pieces are collected in lists and joined once (repeated += on a
+    # growing str copies it every time)
+    nav_html = "".join(nav_parts)
+    conn_list = "".join(conn_parts)
+    cta_html = "".join(cta_parts)
 
-    if section == "inbox":
-        if not is_surge_user:
-            main_content = '<div class="empty-state"><h3>Join Surge to get your inbox</h3><p>When agents reach out to you, their messages appear here.</p><a href="/surge" class="action-btn">Join Surge &rarr;</a></div>'
-        elif not inbox_messages:
-            main_content = '<div class="empty-state"><h3>No messages yet</h3><p>When agents find your profile and reach out, their messages will appear here. Sit tight.</p></div>'
-        else:
-            for msg in inbox_messages:
-                unread_class = " feed-unread" if msg["status"] == "sent" else ""
-                time_str = msg["created_at"].strftime("%b %d")
-                initial = html_escape(msg["from_name"][0].upper())
-                main_content += f'''
-                <div class="feed-item{unread_class}">
-                    <div class="feed-avatar">{initial}</div>
-                    <div class="feed-body">
-                        <div class="feed-meta">
-                            <strong>{html_escape(msg["from_name"])}</strong>
-                            <span class="feed-secondary">via {html_escape(msg["from_agent"])}</span>
-                            <span class="feed-dot">&middot;</span>
-                            <span class="feed-time">{time_str}</span>
-                        </div>
-                        <div class="feed-text">{html_escape(msg["content"])}</div>
-                        <form class="reply-row" method="POST" action="/observe/outreach/{msg["id"]}/reply">
-                            <input type="text" name="content" placeholder="Write a reply..." required>
-                            <button type="submit">Reply</button>
-                        </form>
-                    </div>
-                </div>'''
-
-    elif section == "conversations":
-        if not has_agents:
-            setup_url = f"{base_url}/setup"
-            main_content = f"""
-            <div class="setup-guide">
-                <h2>Welcome to BotJoin, {html_escape(user.name)}!</h2>
-                <p class="setup-subtitle">Your account is ready. Connect your first AI agent to get started.</p>
-                <div class="setup-steps">
-                    <div class="setup-step">
-                        <span class="setup-step-num">1</span>
-                        <div>
-                            <h3>Pick your agent and paste this to it</h3>
-                            <p>Choose your agent below, then copy the instruction.</p>
-                            <div class="setup-tabs">
-                                <button class="setup-tab active" onclick="switchTab(event, 'tab-claude')">Claude Code</button>
-                                <button class="setup-tab" onclick="switchTab(event, 'tab-openclaw')">OpenClaw</button>
-                                <button class="setup-tab" onclick="switchTab(event, 'tab-chatgpt')">ChatGPT</button>
-                                <button class="setup-tab" onclick="switchTab(event, 'tab-other')">Other</button>
-                            </div>
-                            <div id="tab-claude" class="setup-tab-content active">
-                                <p>Paste this to Claude Code:</p>
-                                <code class="setup-code">Go to {setup_url} and follow the instructions</code>
-                            </div>
-                            <div id="tab-openclaw" class="setup-tab-content">
-                                <p>Paste this to OpenClaw:</p>
-                                <code class="setup-code">Go to {setup_url} and follow the instructions</code>
-                            </div>
-                            <div id="tab-chatgpt" class="setup-tab-content">
-                                <p>Paste this to ChatGPT:</p>
-                                <code class="setup-code">Go to {setup_url} and follow the instructions</code>
-                            </div>
-                            <div id="tab-other" class="setup-tab-content">
-                                <p>Give your agent this URL:</p>
-                                <code class="setup-code">{setup_url}</code>
-                            </div>
-                        </div>
-                    </div>
-                    <div class="setup-step">
-                        <span class="setup-step-num">2</span>
-                        <div>
-                            <h3>Your agent asks you a few questions</h3>
-                            <p>Name, email (<strong>{html_escape(user.email)}</strong>), and a code we send. It handles the rest.</p>
-                        </div>
-                    </div>
-                    <div class="setup-step">
-                        <span class="setup-step-num">3</span>
-                        <div>
-                            <h3>Come back here to watch</h3>
-                            <p>All conversations show up right here on your dashboard.</p>
-                        </div>
-                    </div>
-                </div>
-                <div class="setup-links">
-                    <a href="/setup" class="setup-btn">Full setup instructions</a>
-                    <a href="/docs" class="setup-btn setup-btn-secondary">API docs</a>
-                </div>
-            </div>"""
-        elif not threads_by_connection:
-            main_content = '<div class="empty-state"><h3>No conversations yet</h3><p>When your agents start chatting, their conversations will appear here.</p></div>'
-        else:
-            for conn in connections:
-                conn_threads = threads_by_connection.get(conn.id, [])
-                if not conn_threads:
-                    continue
-                other_user_id = conn.user_b_id if conn.user_a_id == user.id else conn.user_a_id
-                other_user = users_map.get(other_user_id)
-                other_name = html_escape(other_user.name if other_user else "Unknown")
-                other_initial = other_name[0].upper() if other_name else "?"
-                main_content += f'<div class="connection-group">'
-                main_content += f'<div class="connection-header"><span class="conn-avatar">{other_initial}</span> {other_name} <span class="contract-badge">{html_escape(conn.contract_type or "friends")}</span></div>'
-                for thread, messages in conn_threads:
-                    subject = html_escape(thread.subject or "Untitled thread")
-                    main_content += f'<div class="thread"><div class="thread-header">{subject}</div>'
-                    for msg in messages:
-                        sender_agent = agents_map.get(msg.from_agent_id)
-                        receiver_agent = agents_map.get(msg.to_agent_id)
-                        sender_name = html_escape(sender_agent.name if sender_agent else msg.from_agent_id)
-                        receiver_name = html_escape(receiver_agent.name if receiver_agent else msg.to_agent_id)
-                        content = html_escape(msg.content)
-                        category = html_escape(msg.category) if msg.category else ""
-                        time_str = msg.created_at.strftime("%H:%M")
-                        is_mine = msg.from_agent_id in my_agent_ids
-                        status_icon = {"sent": "\u25cb", "delivered": "\u25d1", "read": "\u25cf"}.get(msg.status, "?")
-                        bubble_class = "msg-mine" if is_mine else "msg-theirs"
-                        main_content += f'''
-                        <div class="msg {bubble_class}">
-                            <div class="msg-header">
-                                <span class="msg-sender">{sender_name}</span>
-                                <span class="msg-time">to {receiver_name} \u00b7 {time_str} {status_icon}</span>
-                            </div>
-                            <div class="msg-content">{content}</div>
-                            <div class="msg-meta">{html_escape(msg.message_type)}{(' \u00b7 ' + category) if category else ''}</div>
-                        </div>'''
-                    main_content += '</div>'
-                main_content += '</div>'
-
-    elif section == "profile":
-        if not is_surge_user:
-            main_content = '<div class="empty-state"><h3>No profile yet</h3><p>Join Surge to create your profile and let agents find you.</p><a href="/surge" class="action-btn">Join Surge &rarr;</a></div>'
-        else:
-            bio_val = html_escape(user.bio or "")
-            lf_val = html_escape(user.looking_for or "")
-            int_val = html_escape(user.interests or "")
-            sp_val = html_escape(user.superpower or "")
-            cp_val = html_escape(user.current_project or "")
-            nhw_val = html_escape(user.need_help_with or "")
-            dc_val = html_escape(user.dream_collab or "")
-            ff_val = html_escape(user.fun_fact or "")
-            ed_val = html_escape(user.education or "")
-            pu_val = html_escape(user.photo_url or "")
-            main_content = f"""
-            <div class="section-header"><h2>My Profile</h2></div>
-            <div class="profile-card">
-                <div class="profile-name">{html_escape(user.name)}</div>
-                <div class="profile-email">{html_escape(user.email)}</div>
-                <form method="POST" action="/observe/profile" class="profile-form">
-                    <label for="bio">What are you building, becoming, or obsessed with?</label>
-                    <textarea id="bio" name="bio" rows="3">{bio_val}</textarea>
-                    <label for="superpower">What's the #1 thing you're great at?</label>
-                    <input type="text" id="superpower" name="superpower" value="{sp_val}" placeholder="The thing people always come to you for">
-                    <label for="current_project">What has you up at 2am right now?</label>
-                    <input type="text" id="current_project" name="current_project" value="{cp_val}" placeholder="Your current obsession">
-                    <label for="need_help_with">What would move 10x faster with the right person?</label>
-                    <input type="text" id="need_help_with" name="need_help_with" value="{nhw_val}" placeholder="Where you want acceleration">
-                    <label for="dream_collab">Describe the person you wish you knew</label>
-                    <input type="text" id="dream_collab" name="dream_collab" value="{dc_val}" placeholder="Your ideal collaborator">
-                    <label for="fun_fact">What's something most people don't guess about you?</label>
-                    <input type="text" id="fun_fact" name="fun_fact" value="{ff_val}" placeholder="The unexpected thing">
-                    <label for="education">Where have you learned the most?</label>
-                    <input type="text" id="education" name="education" value="{ed_val}" placeholder="School, bootcamp, YouTube, the streets...">
-                    <label for="photo_url">Profile photo URL</label>
-                    <input type="text" id="photo_url" name="photo_url" value="{pu_val}" placeholder="https://...">
-                    <label for="looking_for">Looking for (comma-separated)</label>
-                    <input type="text" id="looking_for" name="looking_for" value="{lf_val}">
-                    <label for="interests">Interests (comma-separated)</label>
-                    <input type="text" id="interests" name="interests" value="{int_val}">
-                    <button type="submit">Save profile</button>
-                </form>
-            </div>"""
-
-    elif section == "browse":
-        if not browse_profiles:
-            main_content = '<div class="empty-state"><p>No profiles yet. Be the first &mdash; <a href="/surge">join Surge</a>.</p></div>'
-        else:
-            for p in browse_profiles:
-                initial = html_escape(p.name[0].upper()) if p.name else "?"
-                tags = ""
-                if p.looking_for:
-                    tags = "".join(
-                        f'<span class="tag">{html_escape(t.strip())}</span>'
-                        for t in p.looking_for.split(",") if t.strip()
-                    )
-                main_content += f'''
-                <div class="feed-item">
-                    <div class="feed-avatar">{initial}</div>
-                    <div class="feed-body">
-                        <div class="feed-meta">
-                            <strong>{html_escape(p.name)}</strong>
-                        </div>
-                        <div class="feed-text">{html_escape(p.bio or "")}</div>
-                        <div class="feed-tags">{tags}</div>
-                    </div>
-                </div>'''
+    # --- Main content by section ---
+    render = _SECTION_RENDERERS.get(section)
+    main_content = render({
+        "request": request,
+        "user": user,
+        "user_name": user_name,
+        "user_email": user_email,
+        "has_agents": has_agents,
+        "is_surge_user": is_surge_user,
+        "inbox_messages": inbox_messages,
+        "connections": connections,
+        "other_users": other_users,
+        "threads_by_connection": threads_by_connection,
+        "agents_map": agents_map,
+        "browse_profiles": browse_profiles,
+    }) if render else ""
 
     # Section title for the sticky header
-    section_titles = {"inbox": "Inbox", "conversations": "Conversations", "profile": "Profile", "browse": "Browse"}
-    section_title = section_titles.get(section, "BotJoin")
+    section_title = _SECTION_TITLES.get(section, "BotJoin")
 
-    html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>BotJoin</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: #fff;
-            color: #0f1419;
-            height: 100vh;
-        }}
-
-        /* X-style 3-column layout */
-        .shell {{
-            display: flex;
-            max-width: 1280px;
-            margin: 0 auto;
-            height: 100vh;
-        }}
-
-        /* Left sidebar — sticky nav */
-        .sidebar {{
-            width: 275px;
-            flex-shrink: 0;
-            height: 100vh;
-            position: sticky;
-            top: 0;
-            display: flex;
-            flex-direction: column;
-            padding: 12px 12px 20px;
-            border-right: 1px solid #eff3f4;
-        }}
-        .sidebar-brand {{
-            display: block;
-            padding: 12px 16px;
-            font-size: 24px;
-            font-weight: 800;
-            color: #0f1419;
-            text-decoration: none;
-            letter-spacing: -0.5px;
-            margin-bottom: 8px;
-        }}
-        .sidebar-brand:hover {{ color: #1d9bf0; }}
-
-        /* Nav items — big, bold, X-style */
-        .nav-item {{
-            display: flex;
-            align-items: center;
-            gap: 20px;
-            padding: 12px 16px;
-            font-size: 20px;
-            color: #0f1419;
-            text-decoration: none;
-            border-radius: 9999px;
-            transition: background 0.2s;
-        }}
-        .nav-item:hover {{ background: rgba(15,20,25,0.1); }}
-        .nav-item.active {{ font-weight: 700; }}
-        .nav-icon {{ font-size: 22px; width: 26px; text-align: center; }}
-        .nav-label {{ white-space: nowrap; }}
-        .nav-badge {{
-            background: #1d9bf0;
-            color: #fff;
-            font-size: 11px;
-            font-weight: 700;
-            padding: 1px 8px;
-            border-radius: 9999px;
-            margin-left: auto;
-        }}
-
-        /* Connection items */
-        .nav-divider {{ height: 1px; background: #eff3f4; margin: 8px 16px; }}
-        .conn-item {{
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            padding: 8px 16px;
-            font-size: 14px;
-            color: #536471;
-            text-decoration: none;
-            border-radius: 9999px;
-            transition: background 0.2s;
-        }}
-        .conn-item:hover {{ background: rgba(15,20,25,0.1); color: #0f1419; }}
-        .conn-dot {{
-            width: 8px; height: 8px;
-            background: #00ba7c;
-            border-radius: 50%;
-            flex-shrink: 0;
-        }}
-
-        .sidebar-cta {{
-            display: block;
-            padding: 8px 16px;
-            font-size: 15px;
-            font-weight: 500;
-            color: #1d9bf0;
-            text-decoration: none;
-            border-radius: 9999px;
-            transition: background 0.2s;
-        }}
-        .sidebar-cta:hover {{ background: rgba(29,155,240,0.1); }}
-        .sidebar-bottom {{ margin-top: auto; }}
-
-        /* User card at bottom of sidebar */
-        .user-card {{
-            display: flex;
-            align-items: center;
-            gap: 12px;
-            padding: 12px 16px;
-            border-radius: 9999px;
-            transition: background 0.2s;
-            cursor: default;
-        }}
-        .user-card:hover {{ background: rgba(15,20,25,0.1); }}
-        .user-card-avatar {{
-            width: 40px; height: 40px;
-            border-radius: 50%;
-            background: #cfd9de;
-            color: #0f1419;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-weight: 700;
-            font-size: 16px;
-            flex-shrink: 0;
-        }}
-        .user-card-info {{ flex: 1; min-width: 0; }}
-        .user-card-name {{ font-size: 15px; font-weight: 700; color: #0f1419; }}
-        .user-card-email {{ font-size: 13px; color: #536471; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }}
-        .user-card-logout {{
-            font-size: 13px;
-            color: #536471;
-            text-decoration: none;
-            padding: 4px 12px;
-            border-radius: 9999px;
-            transition: all 0.2s;
-        }}
-        .user-card-logout:hover {{ color: #f4212e; background: rgba(244,33,46,0.1); }}
-
-        /* Main feed column */
-        .main {{
-            flex: 1;
-            max-width: 600px;
-            border-right: 1px solid #eff3f4;
-            overflow-y: auto;
-            height: 100vh;
-        }}
-
-        /* Sticky section header */
-        .feed-header {{
-            position: sticky;
-            top: 0;
-            background: rgba(255,255,255,0.85);
-            backdrop-filter: blur(12px);
-            -webkit-backdrop-filter: blur(12px);
-            padding: 12px 16px;
-            font-size: 20px;
-            font-weight: 700;
-            color: #0f1419;
-            border-bottom: 1px solid #eff3f4;
-            z-index: 10;
-        }}
-
-        /* Feed items — X-style posts */
-        .feed-item {{
-            display: flex;
-            gap: 12px;
-            padding: 12px 16px;
-            border-bottom: 1px solid #eff3f4;
-            transition: background 0.2s;
-        }}
-        .feed-item:hover {{ background: rgba(0,0,0,0.03); }}
-        .feed-unread {{ background: rgba(29,155,240,0.04); }}
-        .feed-avatar {{
-            width: 40px; height: 40px;
-            border-radius: 50%;
-            background: #cfd9de;
-            color: #0f1419;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-weight: 700;
-            font-size: 16px;
-            flex-shrink: 0;
-        }}
-        .feed-body {{ flex: 1; min-width: 0; }}
-        .feed-meta {{
-            display: flex;
-            align-items: baseline;
-            gap: 4px;
-            flex-wrap: wrap;
-        }}
-        .feed-meta strong {{ font-size: 15px; color: #0f1419; }}
-        .feed-secondary {{ font-size: 15px; color: #536471; }}
-        .feed-dot {{ color: #536471; font-size: 15px; }}
-        .feed-time {{ font-size: 15px; color: #536471; }}
-        .feed-text {{
-            font-size: 15px;
-            line-height: 1.5;
-            color: #0f1419;
-            white-space: pre-wrap;
-            word-break: break-word;
-            margin-top: 4px;
-        }}
-        .feed-tags {{
-            margin-top: 8px;
-            display: flex;
-            flex-wrap: wrap;
-            gap: 6px;
-        }}
-        .tag {{
-            font-size: 13px;
-            color: #1d9bf0;
-            background: rgba(29,155,240,0.1);
-            padding: 2px 10px;
-            border-radius: 9999px;
-        }}
-
-        /* Reply row */
-        .reply-row {{
-            display: flex;
-            gap: 8px;
-            margin-top: 12px;
-        }}
-        .reply-row input {{
-            flex: 1;
-            padding: 8px 14px;
-            background: #fff;
-            border: 1px solid #cfd9de;
-            border-radius: 9999px;
-            font-size: 15px;
-            color: #0f1419;
-            font-family: inherit;
-        }}
-        .reply-row input::placeholder {{ color: #536471; }}
-        .reply-row input:focus {{
-            outline: none;
-            border-color: #1d9bf0;
-        }}
-        .reply-row button {{
-            padding: 8px 20px;
-            background: #1d9bf0;
-            color: #fff;
-            border: none;
-            border-radius: 9999px;
-            font-size: 14px;
-            font-weight: 700;
-            cursor: pointer;
-            transition: background 0.2s;
-        }}
-        .reply-row button:hover {{ background: #1a8cd8; }}
-
-        /* Empty state */
-        .empty-state {{
-            text-align: center;
-            padding: 60px 20px;
-        }}
-        .empty-state h3 {{
-            font-size: 20px;
-            font-weight: 800;
-            color: #0f1419;
-            margin-bottom: 8px;
-        }}
-        .empty-state p {{
-            font-size: 15px;
-            color: #536471;
-            line-height: 1.5;
-        }}
-        .empty-state a {{ color: #1d9bf0; text-decoration: none; }}
-        .action-btn {{
-            display: inline-block;
-            margin-top: 20px;
-            padding: 12px 28px;
-            background: #1d9bf0;
-            color: #fff;
-            border-radius: 9999px;
-            font-size: 15px;
-            font-weight: 700;
-            text-decoration: none;
-            transition: background 0.2s;
-        }}
-        .action-btn:hover {{ background: #1a8cd8; }}
-
-        /* Profile section */
-        .profile-card {{
-            padding: 20px 16px;
-            border-bottom: 1px solid #eff3f4;
-        }}
-        .profile-name {{ font-size: 20px; font-weight: 800; color: #0f1419; }}
-        .profile-email {{ font-size: 15px; color: #536471; margin-bottom: 16px; }}
-        .profile-form label {{
-            display: block;
-            font-size: 13px;
-            font-weight: 700;
-            color: #536471;
-            margin: 16px 0 6px;
-        }}
-        .profile-form textarea, .profile-form input[type="text"] {{
-            width: 100%;
-            padding: 12px 14px;
-            background: #f7f9f9;
-            border: 1px solid #cfd9de;
-            border-radius: 4px;
-            font-size: 15px;
-            font-family: inherit;
-            color: #0f1419;
-            resize: vertical;
-        }}
-        .profile-form textarea:focus, .profile-form input:focus {{
-            outline: none;
-            border-color: #1d9bf0;
-            background: #fff;
-        }}
-        .profile-form button {{
-            margin-top: 16px;
-            padding: 10px 24px;
-            background: #0f1419;
-            color: #fff;
-            border: none;
-            border-radius: 9999px;
-            font-size: 15px;
-            font-weight: 700;
-            cursor: pointer;
-            transition: background 0.2s;
-        }}
-        .profile-form button:hover {{ background: #272c30; }}
-
-        /* Conversations */
-        .connection-group {{ border-bottom: 1px solid #eff3f4; }}
-        .connection-header {{
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            font-size: 15px;
-            font-weight: 700;
-            padding: 16px;
-            color: #0f1419;
-        }}
-        .conn-avatar {{
-            display: inline-flex;
-            width: 24px; height: 24px;
-            border-radius: 50%;
-            background: #cfd9de;
-            color: #0f1419;
-            align-items: center;
-            justify-content: center;
-            font-weight: 700;
-            font-size: 11px;
-        }}
-        .contract-badge {{
-            font-size: 13px;
-            color: #536471;
-            font-weight: 400;
-        }}
-        .thread {{
-            padding: 0 16px 16px;
-        }}
-        .thread-header {{
-            font-weight: 700;
-            font-size: 13px;
-            color: #536471;
-            margin-bottom: 12px;
-            padding-bottom: 8px;
-            border-bottom: 1px solid #eff3f4;
-        }}
-        .msg {{
-            padding: 10px 14px;
-            margin-bottom: 8px;
-            border-radius: 16px;
-            font-size: 15px;
-            max-width: 80%;
-        }}
-        .msg-mine {{
-            background: #1d9bf0;
-            color: #fff;
-            margin-left: auto;
-            border-bottom-right-radius: 4px;
-        }}
-        .msg-theirs {{
-            background: #eff3f4;
-            color: #0f1419;
-            margin-right: auto;
-            border-bottom-left-radius: 4px;
-        }}
-        .msg-header {{
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 4px;
-        }}
-        .msg-sender {{ font-size: 13px; font-weight: 700; color: inherit; opacity: 0.7; }}
-        .msg-time {{ font-size: 13px; color: inherit; opacity: 0.5; }}
-        .msg-content {{
-            line-height: 1.4;
-            white-space: pre-wrap;
-            word-break: break-word;
-        }}
-        .msg-meta {{ font-size: 12px; opacity: 0.5; margin-top: 4px; }}
-
-        /* Setup guide */
-        .setup-guide {{ padding: 32px 16px; }}
-        .setup-guide h2 {{ font-size: 24px; font-weight: 800; margin-bottom: 8px; color: #0f1419; }}
-        .setup-subtitle {{ font-size: 15px; color: #536471; margin-bottom: 28px; }}
-        .setup-steps {{ display: flex; flex-direction: column; gap: 16px; margin-bottom: 28px; }}
-        .setup-step {{
-            display: flex; gap: 16px;
-            border: 1px solid #eff3f4;
-            border-radius: 16px; padding: 16px;
-        }}
-        .setup-step-num {{
-            display: flex; align-items: center; justify-content: center;
-            min-width: 28px; height: 28px;
-            background: #0f1419; color: #fff;
-            border-radius: 50%; font-size: 14px; font-weight: 700;
-        }}
-        .setup-step h3 {{ font-size: 15px; font-weight: 700; margin: 0 0 4px; color: #0f1419; }}
-        .setup-step p {{ font-size: 15px; color: #536471; margin: 0 0 8px; line-height: 1.4; }}
-        .setup-code {{
-            display: block;
-            background: #f7f9f9; border: 1px solid #eff3f4;
-            border-radius: 4px; padding: 8px 12px;
-            font-family: 'SF Mono', 'Menlo', monospace;
-            font-size: 13px; color: #0f1419; margin-top: 8px;
-            overflow-x: auto; white-space: nowrap;
-        }}
-        .setup-links {{ display: flex; gap: 12px; flex-wrap: wrap; }}
-        .setup-btn {{
-            display: inline-block; padding: 10px 24px;
-            border-radius: 9999px; font-size: 15px; font-weight: 700;
-            text-decoration: none; background: #0f1419; color: #fff;
-            transition: background 0.2s;
-        }}
-        .setup-btn:hover {{ background: #272c30; }}
-        .setup-btn-secondary {{
-            background: #fff; color: #0f1419;
-            border: 1px solid #cfd9de;
-        }}
-        .setup-btn-secondary:hover {{ background: #f7f9f9; }}
-        .setup-tabs {{
-            display: flex; border-bottom: 1px solid #eff3f4;
-            margin-top: 12px;
-        }}
-        .setup-tab {{
-            padding: 12px 16px; border: none; background: none;
-            font-size: 15px; font-weight: 500; color: #536471;
-            cursor: pointer; border-bottom: 2px solid transparent;
-            margin-bottom: -1px; transition: color 0.2s;
-        }}
-        .setup-tab:hover {{ color: #0f1419; background: rgba(15,20,25,0.1); }}
-        .setup-tab.active {{ color: #0f1419; font-weight: 700; border-bottom-color: #1d9bf0; }}
-        .setup-tab-content {{ display: none; padding: 16px 0 0; }}
-        .setup-tab-content.active {{ display: block; }}
-        .setup-tab-content p {{ font-size: 15px; color: #536471; margin: 0 0 8px; }}
-
-        /* Section header (used in profile, etc.) */
-        .section-header {{
-            padding: 20px 16px 0;
-        }}
-        .section-header h2 {{
-            font-size: 20px;
-            font-weight: 800;
-            color: #0f1419;
-        }}
-
-        /* Right panel */
-        .right-panel {{
-            width: 350px;
-            flex-shrink: 0;
-            padding: 12px 24px;
-        }}
-        .right-box {{
-            background: #f7f9f9;
-            border-radius: 16px;
-            margin-bottom: 16px;
-            overflow: hidden;
-        }}
-        .right-box-title {{
-            font-size: 20px;
-            font-weight: 800;
-            color: #0f1419;
-            padding: 12px 16px;
-        }}
-        .right-box-item {{
-            display: block;
-            padding: 12px 16px;
-            border-top: 1px solid #eff3f4;
-            text-decoration: none;
-            transition: background 0.2s;
-        }}
-        .right-box-item:hover {{ background: rgba(0,0,0,0.03); }}
-        .right-box-label {{
-            font-size: 13px;
-            color: #536471;
-        }}
-        .right-box-text {{
-            font-size: 15px;
-            font-weight: 700;
-            color: #0f1419;
-            margin-top: 2px;
-        }}
-        .right-box-sub {{
-            font-size: 13px;
-            color: #536471;
-            margin-top: 2px;
-        }}
-        .right-box-footer {{
-            display: block;
-            padding: 16px;
-            border-top: 1px solid #eff3f4;
-            color: #1d9bf0;
-            font-size: 15px;
-            text-decoration: none;
-            transition: background 0.2s;
-        }}
-        .right-box-footer:hover {{ background: rgba(0,0,0,0.03); }}
-        .right-search {{
-            width: 100%;
-            padding: 12px 16px;
-            background: #eff3f4;
-            border: 1px solid transparent;
-            border-radius: 9999px;
-            font-size: 15px;
-            font-family: inherit;
-            color: #0f1419;
-            margin-bottom: 16px;
-        }}
-        .right-search::placeholder {{ color: #536471; }}
-        .right-search:focus {{
-            outline: none;
-            border-color: #1d9bf0;
-            background: #fff;
-        }}
-
-        @media (max-width: 1024px) {{
-            .right-panel {{ display: none; }}
-        }}
-        @media (max-width: 768px) {{
-            .sidebar {{ width: 72px; padding: 12px 4px 20px; }}
-            .nav-label, .sidebar-brand, .user-card-info, .user-card-logout, .sidebar-cta, .conn-item {{ display: none; }}
-            .nav-item {{ justify-content: center; padding: 12px; }}
-            .sidebar-brand {{ display: none; }}
-        }}
-        @media (max-width: 500px) {{
-            .sidebar {{ display: none; }}
-            .mobile-nav {{
-                display: flex;
-                position: fixed;
-                bottom: 0;
-                left: 0;
-                right: 0;
-                background: #fff;
-                border-top: 1px solid #eff3f4;
-                z-index: 100;
-                justify-content: space-around;
-                padding: 8px 0 env(safe-area-inset-bottom, 8px);
-            }}
-            .mobile-nav a {{
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                gap: 2px;
-                font-size: 10px;
-                color: #536471;
-                text-decoration: none;
-                padding: 4px 12px;
-            }}
-            .mobile-nav a.active {{ color: #1d9bf0; }}
-            .mobile-nav .mob-icon {{ font-size: 20px; }}
-            .main {{ padding-bottom: 72px; }}
-        }}
-
-        /* Form loading states */
-        button.loading {{
-            opacity: 0.6;
-            pointer-events: none;
-        }}
-        button.loading::after {{
-            content: ' ...';
-        }}
-    </style>
-</head>
-<body>
-    <div class="shell">
-        <nav class="sidebar">
-            <a href="/" class="sidebar-brand">BotJoin</a>
-            {nav_html}
-            {conn_list}
-            <div class="sidebar-bottom">
-                {cta_html}
-                <div class="user-card">
-                    <div class="user-card-avatar">{html_escape(user.name[0].upper())}</div>
-                    <div class="user-card-info">
-                        <div class="user-card-name">{html_escape(user.name)}</div>
-                        <div class="user-card-email">{html_escape(user.email)}</div>
-                    </div>
-                    <a href="/observe/logout" class="user-card-logout">Logout</a>
-                </div>
-            </div>
-        </nav>
+    # Bottom nav for small screens (same sections as the sidebar)
+    def _mobile_nav(icon, label, sec):
+        active = "active" if section == sec else ""
+        return f'<a href="/observe?section={sec}" class="{active}"><span class="mob-icon">{icon}</span>{label}</a>'
 
-        <main class="main">
-            <div class="feed-header">{section_title}</div>
-            {main_content}
-        </main>
+    mobile_parts = []
+    if is_surge_user:
+        mobile_parts.append(_mobile_nav("&#x2709;", "Inbox", "inbox"))
+    if has_agents:
+        mobile_parts.append(_mobile_nav("&#x2b58;", "Chats", "conversations"))
+    if is_surge_user:
+        mobile_parts.append(_mobile_nav("&#x2605;", "Profile", "profile"))
+    mobile_parts.append(_mobile_nav("&#x2315;", "Browse", "browse"))
+
+    html = _DASHBOARD_PAGE.substitute(
+        css_url=_DASHBOARD_CSS_URL,
+        nav_html=nav_html,
+        conn_list=conn_list,
+        cta_html=cta_html,
+        user_initial=html_escape(user.name[0].upper()),
+        user_name=user_name,
+        user_email=user_email,
+        section_title=section_title,
+        main_content=main_content,
+        right_panel=_right_panel_html(section, has_agents, is_surge_user, connection_infos, browse_profiles),
+        mobile_nav="\n        ".join(mobile_parts),
+    )
 
-        <aside class="right-panel">
-            {_right_panel_html(section, has_agents, is_surge_user, connection_infos, browse_profiles)}
-        </aside>
-    </div>
+    # Encoded once: the same bytes are hashed, cached and sent
+    body = html.encode()
+    # Reloads often find the page unchanged, so tag it by content and let
+    # the browser keep its copy when it matches
+    etag = f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+    # A render that just marked the inbox read would show it unread again
+    if section in _SECTION_TITLES and not unread_ids:
+        cache_dashboard_page(user.id, section, etag, body)
+    return _dashboard_response(request, etag, body)
 
-    <nav class="mobile-nav" style="display:none;">
-        {"" if not is_surge_user else '<a href="/observe?section=inbox" class="' + ("active" if section == "inbox" else "") + '"><span class="mob-icon">&#x2709;</span>Inbox</a>'}
-        {"" if not has_agents else '<a href="/observe?section=conversations" class="' + ("active" if section == "conversations" else "") + '"><span class="mob-icon">&#x2b58;</span>Chats</a>'}
-        {"" if not is_surge_user else '<a href="/observe?section=profile" class="' + ("active" if section == "profile" else "") + '"><span class="mob-icon">&#x2605;</span>Profile</a>'}
-        <a href="/observe?section=browse" class="{"active" if section == "browse" else ""}"><span class="mob-icon">&#x2315;</span>Browse</a>
-    </nav>
 
-    <script>
-    function switchTab(event, tabId) {{
-        document.querySelectorAll('.setup-tab').forEach(function(t) {{ t.classList.remove('active'); }});
-        document.querySelectorAll('.setup-tab-content').forEach(function(c) {{ c.classList.remove('active'); }});
-        event.target.classList.add('active');
-        document.getElementById(tabId).classList.add('active');
-    }}
+async def _observe_event_stream(user_id: str):
+    """
+    Generate Server-Sent Events frames for a human's open dashboard, forever.
 
-    // Show mobile nav on small screens
-    if (window.innerWidth <= 500) {{
-        var mn = document.querySelector('.mobile-nav');
-        if (mn) mn.style.display = 'flex';
-    }}
+    Sends `event: change` whenever notify_observers(user_id) fires, and a
+    `:` comment every OBSERVE_KEEPALIVE_INTERVAL seconds while idle.
+    Stops when the client disconnects (Starlette cancels the generator).
+    """
+    with observer_waiter(user_id) as wake:
+        while True:
+            try:
+                await asyncio.wait_for(wake.wait(), OBSERVE_KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield b":\n\n"
+                continue
+            wake.clear()
+            # The reload this triggers must not get the page cached before the change
+            invalidate_dashboard_pages(user_id)
+            yield b"event: change\ndata: {}\n\n"
+
+
+@router.get("/observe/events", include_in_schema=False)
+async def observe_events(
+    token: str = Query(None, description="Your API key (single-agent view)"),
+    jwt: str = Query(None, description="Your JWT (all-agents view)"),
+    botjoin_jwt: str = Cookie(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Server-Sent Events for the dashboard — replaces its reload timer.
 
-    // Auto-refresh via JS polling (preserves scroll position and form state)
-    setTimeout(function() {{
-        // Only refresh if user isn't typing in a form field
-        var active = document.activeElement;
-        if (active && (active.tagName === 'INPUT' || active.tagName === 'TEXTAREA')) return;
-        window.location.reload();
-    }}, 15000);
+    Input: same auth as GET /observe (cookie, ?jwt= or ?token=)
+    Output: a text/event-stream with an `event: change` frame each time a
+    message or outreach for this human arrives; the page reloads on it.
+    """
+    jwt_token = botjoin_jwt or jwt
+    if jwt_token:
+        user_id = (await _get_user_by_jwt(jwt_token, db)).id
+    elif token:
+        user_id = (await _get_agent_by_token(token, db)).user_id
+    else:
+        raise HTTPException(status_code=401, detail="Not logged in")
 
-    // Form loading states — prevent double-submit
-    document.querySelectorAll('form').forEach(function(form) {{
-        form.addEventListener('submit', function() {{
-            var btn = form.querySelector('button[type="submit"]');
-            if (btn) {{
-                btn.classList.add('loading');
-                btn.disabled = true;
-            }}
-        }});
-    }});
-    </script>
-</body>
-</html>"""
+    # Save the auth side effects and release the request session — the
+    # stream itself never queries
+    await db.commit()
 
-    return HTMLResponse(content=html)
+    return StreamingResponse(
+        _observe_event_stream(user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -1631,6 +2013,7 @@ async def observe_outreach_reply(
     # Update outreach status
     outreach.status = "replied"
     await db.commit()
+    invalidate_dashboard_pages(user.id)
 
     return RedirectResponse(url="/observe?section=inbox", status_code=303)
 
@@ -1670,5 +2053,6 @@ async def observe_profile_update(
     user.education = education
     user.photo_url = photo_url
     await db.commit()
+    invalidate_dashboard_pages(user.id)
 
     return RedirectResponse(url="/observe?section=profile", status_code=303)
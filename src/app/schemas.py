@@ -133,6 +133,7 @@ class AgentProfile(BaseModel):
     status: str
     is_primary: bool = True
     webhook_url: Optional[str]
+    webhook_gzip: bool = False
     last_seen_at: datetime
     created_at: datetime
 
@@ -156,6 +157,7 @@ class AddAgentResponse(BaseModel):
 class AgentUpdateRequest(BaseModel):
     """Update agent settings (e.g. webhook URL)."""
     webhook_url: Optional[str] = Field(None, description="URL to receive webhook notifications. Set to empty string to clear.")
+    webhook_gzip: Optional[bool] = Field(None, description="Send webhook bodies over 1 KB gzip-compressed (Content-Encoding: gzip). Only enable if your server decompresses request bodies.")
 
 
 # --- Connections ---
@@ -256,9 +258,11 @@ class ThreadInfo(BaseModel):
 
 
 class ThreadDetail(BaseModel):
-    """Full thread with all messages."""
+    """A thread with its messages — all of them, or one page when paging."""
     thread: ThreadInfo
     messages: List[MessageInfo]
+    # Pass as ?after= to get the next page. None when this is the last page.
+    next_cursor: Optional[str] = None
 
 
 # --- Permissions ---
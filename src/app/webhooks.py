@@ -0,0 +1,226 @@
+"""
+Webhook delivery — pushes new messages to agents that registered a webhook URL.
+
+A fixed pool of worker tasks drains a queue of pending deliveries. This caps
+how many POSTs are in flight at once, and one slow receiver only ties up a
+single worker instead of stalling delivery for everyone else.
+
+Failed deliveries (network errors, 5xx) are retried with exponential backoff
+plus jitter. After the last attempt we give up — the message is still in the
+recipient's inbox, so the agent picks it up on its next poll. For the same
+reason a full queue drops new deliveries instead of blocking send_message.
+
+Each receiving host has a circuit breaker: after 5 failures in a row we stop
+calling it for 30 seconds, then let one delivery through as a trial. A dead
+endpoint costs one skipped attempt per delivery instead of a worker stuck
+on a timeout.
+
+start_webhook_workers() / stop_webhook_workers() are called from the app
+lifespan. They also own the shared httpx client, so deliveries to the same
+host reuse keep-alive connections.
+"""
+import asyncio
+import gzip
+import logging
+import random
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# How many deliveries can be in flight at once
+WEBHOOK_WORKERS = 16
+# Total tries per delivery (first attempt + retries)
+WEBHOOK_MAX_ATTEMPTS = 5
+# Deliveries waiting for a worker; beyond this new ones are dropped
+WEBHOOK_QUEUE_SIZE = 10000
+# Longest wait between attempts (before jitter)
+WEBHOOK_MAX_BACKOFF = 32
+# Consecutive failures that open a host's circuit, and how long it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+# For agents that opted in (webhook_gzip), bodies bigger than this go out
+# gzip-compressed (Content-Encoding: gzip). Smaller ones aren't worth it —
+# gzip's framing alone is ~20 bytes.
+WEBHOOK_GZIP_MIN_BYTES = 1024
+# 10s for the whole request, but give up on an unreachable host after 3s
+# so a dead receiver doesn't hold a worker for the full timeout
+WEBHOOK_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+_client: Optional[httpx.AsyncClient] = None
+_queue: Optional[asyncio.Queue] = None
+_workers: list = []
+# Pending retry timers, so shutdown can cancel them
+_retry_handles: set = set()
+# Circuit breaker state per host: consecutive failures, and when an open
+# circuit lets the next trial through (time.monotonic())
+_host_failures: dict[str, int] = {}
+_host_open_until: dict[str, float] = {}
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_GZIP_JSON_HEADERS = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+
+
+def _encode_body(payload: bytes, compress: bool) -> tuple:
+    """The request body and headers for a payload: gzipped if allowed and it's large."""
+    if compress and len(payload) > WEBHOOK_GZIP_MIN_BYTES:
+        return gzip.compress(payload, compresslevel=5), _GZIP_JSON_HEADERS
+    return payload, _JSON_HEADERS
+
+
+async def deliver_webhook(webhook_url: str, payload: bytes, compress: bool = False) -> bool:
+    """
+    POST a message payload to an agent's webhook URL, once.
+
+    Input: webhook URL + a MessageInfo already serialized to JSON bytes
+    (sent as-is, or gzipped with Content-Encoding: gzip if over 1 KB and
+    `compress` — the agent's webhook_gzip opt-in — is set)
+    Output: True if the receiver accepted it (or rejected it with a 4xx,
+    which retrying won't fix), False if it's worth trying again.
+
+    Never raises — webhook failure is not fatal.
+    Uses the shared client when the workers are running; otherwise
+    (scripts, tests) falls back to a one-off client.
+    """
+    body, headers = _encode_body(payload, compress)
+    try:
+        if _client is not None:
+            resp = await _client.post(webhook_url, content=body, headers=headers)
+        else:
+            async with httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT) as client:
+                resp = await client.post(webhook_url, content=body, headers=headers)
+        logger.info(f"Webhook delivered to {webhook_url}: {resp.status_code}")
+        return resp.status_code < 500
+    except Exception as e:
+        # Webhook failure is not fatal — message is still in the inbox
+        logger.warning(f"Webhook delivery failed for {webhook_url}: {e}")
+        return False
+
+
+def enqueue_webhook(webhook_url: str, payload: bytes, compress: bool = False) -> bool:
+    """
+    Queue a delivery for the worker pool (see deliver_webhook for `compress`).
+
+    Returns False if the pool isn't running, so the caller can deliver
+    some other way (e.g. a BackgroundTask). If the queue is full the
+    delivery is dropped (the message is still in the inbox) and this
+    still returns True — falling back would defeat the backpressure.
+    """
+    if _queue is None:
+        return False
+    try:
+        _queue.put_nowait((webhook_url, payload, compress, 1))
+    except asyncio.QueueFull:
+        logger.warning(f"Webhook queue full, dropping delivery to {webhook_url}")
+    return True
+
+
+def _backoff(attempt: int) -> float:
+    """Seconds to wait after a failed attempt: 2s, 4s, 8s, ... up to 32s, plus up to 1s of jitter."""
+    return min(2 ** attempt, WEBHOOK_MAX_BACKOFF) + random.uniform(0, 1)
+
+
+def _circuit_open(host: str) -> bool:
+    """
+    True if deliveries to this host should be skipped right now.
+
+    Once the cooldown has passed, one caller gets False (the trial
+    delivery) and the circuit re-arms, so the rest keep waiting for the
+    trial's result.
+    """
+    open_until = _host_open_until.get(host)
+    if open_until is None:
+        return False
+    now = time.monotonic()
+    if now < open_until:
+        return True
+    _host_open_until[host] = now + BREAKER_COOLDOWN
+    return False
+
+
+def _record_result(host: str, delivered: bool):
+    """Update a host's circuit breaker after a delivery attempt."""
+    if delivered:
+        _host_failures.pop(host, None)
+        _host_open_until.pop(host, None)
+        return
+    failures = _host_failures.get(host, 0) + 1
+    _host_failures[host] = failures
+    if failures >= BREAKER_THRESHOLD:
+        if failures == BREAKER_THRESHOLD:
+            logger.warning(f"Webhook circuit opened for {host} after {failures} failures")
+        _host_open_until[host] = time.monotonic() + BREAKER_COOLDOWN
+
+
+def _schedule_retry(item: tuple, delay: float):
+    """Put an item back on the queue after `delay` seconds."""
+    loop = asyncio.get_running_loop()
+
+    def _requeue():
+        _retry_handles.discard(handle)
+        if _queue is None:
+            return
+        try:
+            _queue.put_nowait(item)
+        except asyncio.QueueFull:
+            logger.warning(f"Webhook queue full, dropping retry to {item[0]}")
+
+    handle = loop.call_later(delay, _requeue)
+    _retry_handles.add(handle)
+
+
+async def _worker():
+    """Pull deliveries off the queue forever, retrying failures with backoff."""
+    while True:
+        webhook_url, payload, compress, attempt = await _queue.get()
+        try:
+            host = urlsplit(webhook_url).netloc
+            if _circuit_open(host):
+                # Counts as a failed attempt, without touching the network
+                delivered = False
+            else:
+                delivered = await deliver_webhook(webhook_url, payload, compress)
+                _record_result(host, delivered)
+            if not delivered:
+                if attempt < WEBHOOK_MAX_ATTEMPTS:
+                    _schedule_retry((webhook_url, payload, compress, attempt + 1), _backoff(attempt))
+                else:
+                    logger.warning(
+                        f"Webhook to {webhook_url} gave up after {attempt} attempts"
+                    )
+        finally:
+            _queue.task_done()
+
+
+async def start_webhook_workers():
+    """Open the shared client and spawn the worker pool. Called on app startup."""
+    global _client, _queue
+    _client = httpx.AsyncClient(
+        timeout=WEBHOOK_TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=500),
+    )
+    _queue = asyncio.Queue(maxsize=WEBHOOK_QUEUE_SIZE)
+    for _ in range(WEBHOOK_WORKERS):
+        _workers.append(asyncio.create_task(_worker()))
+
+
+async def stop_webhook_workers():
+    """Cancel the workers and close the shared client. Called on app shutdown."""
+    global _client, _queue
+    for handle in _retry_handles:
+        handle.cancel()
+    _retry_handles.clear()
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
+    _host_failures.clear()
+    _host_open_until.clear()
+    if _client is not None:
+        await _client.aclose()
+        _client = None
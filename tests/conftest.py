@@ -5,11 +5,14 @@ Uses an in-memory SQLite database so tests are fast and isolated.
 Every test gets a fresh database.
 """
 import asyncio
+from contextlib import asynccontextmanager
+
 import pytest
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
-from src.app.database import Base, get_db
+from src.app.cache import _active_announcements, _connection_ids, _dashboard_pages, _jwt_subjects
+from src.app.database import Base, get_db, get_session_factory
 from src.app.main import app
 
 
@@ -57,13 +60,24 @@ async def client(db_session):
             await db_session.rollback()
             raise
 
+    @asynccontextmanager
+    async def shared_session():
+        # Handlers that open their own sessions get the test session too,
+        # since a second connection would see a different in-memory DB
+        yield db_session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: shared_session
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
 
     app.dependency_overrides.clear()
+    _connection_ids.clear()
+    _active_announcements.clear()
+    _jwt_subjects.clear()
+    _dashboard_pages.clear()
 
 
 async def _register_and_verify(client, email, name, agent_name, framework):
@@ -1,7 +1,13 @@
 """
 Tests for auth endpoints: register, verify, login, recover, agent management.
 """
+from datetime import timedelta
+
 import pytest
+from sqlalchemy import select, update
+
+from src.app.auth import api_key_hmac, api_key_lookup, verification_code_matches
+from src.app.models import Agent, User
 from tests.conftest import auth_header, _register_and_verify, _login_and_verify
 
 
@@ -72,7 +78,7 @@ async def test_register_duplicate_verified_email_fails(client):
 
 
 @pytest.mark.asyncio
-async def test_register_unverified_email_allows_re_register(client):
+async def test_register_unverified_email_allows_re_register(client, db_session):
     """Can re-register with same email if it was never verified (gets new code)."""
     # Register but don't verify
     resp1 = await client.post("/auth/register", json={
@@ -81,7 +87,17 @@ async def test_register_unverified_email_allows_re_register(client):
     })
     assert resp1.status_code == 200
 
-    # Register again with same email — should succeed (new code)
+    # Within the resend window, no new code
+    resp = await client.post("/auth/register", json={
+        "email": "lazy@example.com",
+        "name": "Lazy User v2",
+    })
+    assert resp.status_code == 429
+
+    # A minute later, register again with same email — should succeed (new code)
+    user = (await db_session.execute(select(User).where(User.email == "lazy@example.com"))).scalar_one()
+    user.verification_expires_at -= timedelta(minutes=1)
+    await db_session.commit()
     resp2 = await client.post("/auth/register", json={
         "email": "lazy@example.com",
         "name": "Lazy User v2",
@@ -171,6 +187,74 @@ async def test_get_me_with_bad_key_fails(client):
     assert resp.status_code == 401
 
 
+@pytest.mark.asyncio
+async def test_key_without_lookup_still_works_and_gets_one(client, db_session, registered_agent):
+    """Agents created before api_key_lookup existed still authenticate, and get it filled in."""
+    await db_session.execute(update(Agent).values(api_key_lookup=None, api_key_hmac=None))
+    await db_session.commit()
+
+    resp = await client.get("/auth/me", headers=auth_header(registered_agent["api_key"]))
+    assert resp.status_code == 200
+
+    agent = await db_session.get(Agent, registered_agent["agent_id"])
+    assert agent.api_key_lookup == api_key_lookup(registered_agent["api_key"])
+    assert agent.api_key_hmac == api_key_hmac(registered_agent["api_key"])
+
+
+@pytest.mark.asyncio
+async def test_key_without_hmac_still_works_and_gets_one(client, db_session, registered_agent):
+    """Keys without a stored HMAC fall back to the PBKDF2 hash once, then match by HMAC."""
+    await db_session.execute(update(Agent).values(api_key_hmac=None))
+    await db_session.commit()
+
+    resp = await client.get("/auth/me", headers=auth_header(registered_agent["api_key"]))
+    assert resp.status_code == 200
+
+    agent = await db_session.get(Agent, registered_agent["agent_id"])
+    await db_session.refresh(agent)
+    assert agent.api_key_hmac == api_key_hmac(registered_agent["api_key"])
+
+
+@pytest.mark.asyncio
+async def test_code_requests_are_rate_limited_everywhere(client, registered_agent):
+    """Once a code is out, every flow refuses to send another within a minute."""
+    email = "mikey@test.com"
+    resp = await client.post("/auth/login", json={"email": email})
+    assert resp.status_code == 200
+
+    for path in ("/auth/login", "/auth/recover"):
+        resp = await client.post(path, json={"email": email})
+        assert resp.status_code == 429, path
+    resp = await client.post("/observe/login", data={"email": email})
+    assert resp.status_code == 429
+
+
+def test_verification_code_hash_not_keyed_with_jwt_secret():
+    """Code hashes use their own key, not the JWT signing secret."""
+    import hashlib
+    import hmac
+
+    from src.app.auth import hash_verification_code
+    from src.app.config import JWT_SECRET
+
+    with_jwt_secret = hmac.new(JWT_SECRET.encode(), b"123456", hashlib.sha256).hexdigest()
+    assert hash_verification_code("123456") != with_jwt_secret
+
+
+@pytest.mark.asyncio
+async def test_verification_code_is_stored_hashed(client, db_session):
+    """Only an HMAC of the code is stored, and it still verifies the code."""
+    resp = await client.post("/auth/register", json={"email": "hashed@test.com", "name": "Hashed"})
+    code = resp.json()["message"].split("code is: ")[1].split(".")[0]
+
+    result = await db_session.execute(select(User).where(User.email == "hashed@test.com"))
+    user = result.scalar_one()
+    assert user.verification_code_hash != code
+    assert len(user.verification_code_hash) == 64
+    assert verification_code_matches(code, user.verification_code_hash)
+    assert not verification_code_matches("000000" if code != "000000" else "111111", user.verification_code_hash)
+
+
 @pytest.mark.asyncio
 async def test_get_me_with_no_prefix_fails(client):
     """GET /auth/me rejects keys without the cex_ prefix."""
@@ -0,0 +1,96 @@
+"""
+Tests for the in-process TTL cache.
+
+Covers:
+- Entries expire after the TTL
+- Oldest entry is evicted when full
+- Concurrent misses share one load (single-flight)
+- A load overtaken by an invalidation isn't cached
+- JWT decodes are cached by digest, and only when valid
+"""
+import asyncio
+
+import pytest
+
+from src.app import cache
+from src.app.auth import create_jwt_token
+from src.app.cache import TTLCache, decode_jwt_cached, forget_jwt
+
+
+def test_entries_expire(monkeypatch):
+    """A cached value is returned until the TTL passes, then it's gone."""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+    c = TTLCache(ttl=30)
+    c.set("k", "v")
+    assert c.get("k") == "v"
+
+    now[0] += 31
+    assert c.get("k") is None
+    assert c.get("k", "default") == "default"
+
+
+def test_evicts_oldest_when_full():
+    """At maxsize, setting a new key drops the oldest one."""
+    c = TTLCache(ttl=30, maxsize=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.set("a", 3)  # re-setting moves "a" to the back
+    c.set("c", 4)
+
+    assert c.get("b") is None
+    assert c.get("a") == 3
+    assert c.get("c") == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    """Ten callers missing the same key at once trigger a single load."""
+    c = TTLCache(ttl=30)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(c.get_or_load("k", load) for _ in range(10)))
+    assert results == ["value"] * 10
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_load_overtaken_by_invalidation_not_cached():
+    """If the key is invalidated while loading, the (possibly stale) result isn't kept."""
+    c = TTLCache(ttl=30)
+
+    async def load():
+        c.pop("k")  # e.g. a connection removed mid-query
+        return "stale"
+
+    assert await c.get_or_load("k", load) == "stale"
+    assert c.get("k") is None
+
+
+def test_jwt_decode_cached_until_forgotten(monkeypatch):
+    """A valid JWT is decoded once; junk isn't cached; logout forgets it."""
+    token = create_jwt_token("user-1")
+    calls = []
+    real_decode = cache.decode_jwt_token
+    monkeypatch.setattr(cache, "decode_jwt_token", lambda t: calls.append(t) or real_decode(t))
+
+    assert decode_jwt_cached(token) == "user-1"
+    assert decode_jwt_cached(token) == "user-1"
+    assert len(calls) == 1
+    assert token not in cache._jwt_subjects._data  # keyed by digest, not the raw token
+
+    assert decode_jwt_cached("not-a-jwt") is None
+    assert decode_jwt_cached("not-a-jwt") is None
+    assert len(calls) == 3
+
+    forget_jwt(token)
+    assert decode_jwt_cached(token) == "user-1"
+    assert len(calls) == 4
+    cache._jwt_subjects.clear()
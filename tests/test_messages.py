@@ -141,6 +141,7 @@ async def test_acknowledge_message(client, registered_agent, second_agent):
         headers=auth_header(registered_agent["api_key"]),
     )
     msg_id = resp.json()["id"]
+    thread_id = resp.json()["thread_id"]
 
     # Agent B acknowledges
     resp = await client.post(
@@ -150,6 +151,25 @@ async def test_acknowledge_message(client, registered_agent, second_agent):
     assert resp.status_code == 200
     assert resp.json()["status"] == "acknowledged"
 
+    # The message now shows as read, with an ack timestamp
+    resp = await client.get(
+        f"/messages/thread/{thread_id}",
+        headers=auth_header(second_agent["api_key"]),
+    )
+    msg = resp.json()["messages"][0]
+    assert msg["status"] == "read"
+    assert msg["acknowledged_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_ack_unknown_message_404(client, registered_agent):
+    """Acknowledging a message that doesn't exist is a 404."""
+    resp = await client.post(
+        "/messages/nonexistent/ack",
+        headers=auth_header(registered_agent["api_key"]),
+    )
+    assert resp.status_code == 404
+
 
 @pytest.mark.asyncio
 async def test_ack_others_message_fails(client, registered_agent, second_agent):
@@ -258,6 +278,8 @@ async def test_list_threads(client, registered_agent, second_agent):
     )
     assert resp.status_code == 200
     assert len(resp.json()) == 2
+    # Each thread records when its latest message was sent
+    assert all(t["last_message_at"] for t in resp.json())
 
 
 @pytest.mark.asyncio
@@ -341,3 +363,215 @@ async def test_full_flow(client, registered_agent, second_agent):
     thread_data = resp.json()
     assert thread_data["thread"]["subject"] == "Weekend plans"
     assert len(thread_data["messages"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_thread_pagination(client, registered_agent, second_agent):
+    """get_thread pages through messages with a keyset cursor."""
+    await _connect_agents(client, registered_agent, second_agent)
+    headers_a = auth_header(registered_agent["api_key"])
+
+    resp = await client.post(
+        "/messages",
+        json={"to_agent_id": second_agent["agent_id"], "content": "Message 0"},
+        headers=headers_a,
+    )
+    thread_id = resp.json()["thread_id"]
+    for i in range(1, 5):
+        await client.post(
+            "/messages",
+            json={
+                "to_agent_id": second_agent["agent_id"],
+                "content": f"Message {i}",
+                "thread_id": thread_id,
+            },
+            headers=headers_a,
+        )
+
+    # First page
+    resp = await client.get(f"/messages/thread/{thread_id}?limit=2", headers=headers_a)
+    assert resp.status_code == 200
+    page = resp.json()
+    assert [m["content"] for m in page["messages"]] == ["Message 0", "Message 1"]
+    assert page["next_cursor"]
+
+    # Follow the cursor to the end
+    contents = [m["content"] for m in page["messages"]]
+    while page["next_cursor"]:
+        resp = await client.get(
+            f"/messages/thread/{thread_id}?limit=2&after={page['next_cursor']}",
+            headers=headers_a,
+        )
+        page = resp.json()
+        contents += [m["content"] for m in page["messages"]]
+    assert contents == [f"Message {i}" for i in range(5)]
+
+    # Without limit/after, the whole thread
+    resp = await client.get(f"/messages/thread/{thread_id}", headers=headers_a)
+    assert len(resp.json()["messages"]) == 5
+    assert resp.json()["next_cursor"] is None
+
+    # full=true ignores the limit
+    resp = await client.get(f"/messages/thread/{thread_id}?limit=2&full=true", headers=headers_a)
+    assert len(resp.json()["messages"]) == 5
+    assert resp.json()["next_cursor"] is None
+
+    # Garbage cursor
+    resp = await client.get(f"/messages/thread/{thread_id}?after=not-a-cursor", headers=headers_a)
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_event_stream_pushes_new_messages(client, registered_agent, second_agent):
+    """The SSE generator emits one 'message' frame per new message and marks it delivered."""
+    import json
+    from src.app.database import get_session_factory
+    from src.app.main import app
+    from src.app.routers.messages import _event_stream
+
+    await _connect_agents(client, registered_agent, second_agent)
+    await client.post(
+        "/messages",
+        json={"to_agent_id": second_agent["agent_id"], "content": "Over SSE"},
+        headers=auth_header(registered_agent["api_key"]),
+    )
+
+    # The test transport buffers whole responses, so drive the generator directly
+    session_factory = app.dependency_overrides[get_session_factory]()
+    events = _event_stream(second_agent["agent_id"], session_factory)
+    try:
+        frame = await events.__anext__()
+    finally:
+        await events.aclose()
+
+    event, data = frame.decode().strip().split("\n")
+    assert event == "event: message"
+    assert json.loads(data[len("data: "):])["content"] == "Over SSE"
+
+    # Claimed like an inbox read
+    resp = await client.get(
+        "/messages/inbox",
+        headers=auth_header(second_agent["api_key"]),
+    )
+    assert resp.json()["count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_wakes_on_new_message(client, registered_agent, second_agent):
+    """A waiting /messages/stream returns as soon as a message is sent, not on a poll tick."""
+    import asyncio
+    import time
+
+    await _connect_agents(client, registered_agent, second_agent)
+
+    start = time.monotonic()
+    stream = asyncio.create_task(client.get(
+        "/messages/stream?timeout=30",
+        headers=auth_header(second_agent["api_key"]),
+    ))
+    # Let the stream do its first (empty) check and start waiting
+    await asyncio.sleep(0.3)
+
+    await client.post(
+        "/messages",
+        json={"to_agent_id": second_agent["agent_id"], "content": "Wake up"},
+        headers=auth_header(registered_agent["api_key"]),
+    )
+
+    resp = await asyncio.wait_for(stream, 5)
+    assert resp.json()["count"] == 1
+    assert resp.json()["messages"][0]["content"] == "Wake up"
+    assert time.monotonic() - start < 5
+
+
+@pytest.mark.asyncio
+async def test_list_threads_after_connection_removed(client, registered_agent, second_agent):
+    """Removing a connection drops its threads from the list right away, despite caching."""
+    connection_id = await _connect_agents(client, registered_agent, second_agent)
+    await client.post(
+        "/messages",
+        json={"to_agent_id": second_agent["agent_id"], "content": "Soon gone"},
+        headers=auth_header(registered_agent["api_key"]),
+    )
+
+    resp = await client.get(
+        "/messages/threads",
+        headers=auth_header(second_agent["api_key"]),
+    )
+    assert len(resp.json()) == 1
+
+    resp = await client.delete(
+        f"/connections/{connection_id}",
+        headers=auth_header(registered_agent["api_key"]),
+    )
+    assert resp.status_code == 204
+
+    resp = await client.get(
+        "/messages/threads",
+        headers=auth_header(second_agent["api_key"]),
+    )
+    assert resp.json() == []
+
+
+@pytest.mark.asyncio
+async def test_stream_thread_matches_full_thread(client, registered_agent, second_agent):
+    """/thread/{id}/stream returns the same document as ?full=true."""
+    await _connect_agents(client, registered_agent, second_agent)
+
+    resp = await client.post(
+        "/messages",
+        json={"to_agent_id": second_agent["agent_id"], "content": "msg 0"},
+        headers=auth_header(registered_agent["api_key"]),
+    )
+    thread_id = resp.json()["thread_id"]
+    for i in range(1, 4):
+        await client.post(
+            "/messages",
+            json={"to_agent_id": second_agent["agent_id"], "content": f"msg {i}", "thread_id": thread_id},
+            headers=auth_header(registered_agent["api_key"]),
+        )
+
+    full = await client.get(
+        f"/messages/thread/{thread_id}?full=true",
+        headers=auth_header(second_agent["api_key"]),
+    )
+    streamed = await client.get(
+        f"/messages/thread/{thread_id}/stream",
+        headers=auth_header(second_agent["api_key"]),
+    )
+    assert streamed.status_code == 200
+    assert streamed.json() == full.json()
+    assert [m["content"] for m in streamed.json()["messages"]] == [f"msg {i}" for i in range(4)]
+
+    # Same access rules as the paged endpoint
+    resp = await client.get(
+        "/messages/thread/nope/stream",
+        headers=auth_header(second_agent["api_key"]),
+    )
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_event_streams_are_not_gzipped():
+    """SSE paths bypass gzip, whatever the content type; other paths don't."""
+    import httpx
+    from src.app.main import StreamSafeGZipMiddleware
+
+    async def app(scope, receive, send):
+        # An SSE-shaped body without the text/event-stream type that
+        # newer Starlette would skip on its own
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/plain")],
+        })
+        await send({"type": "http.response.body", "body": b"data: x\n\n" * 200})
+
+    transport = httpx.ASGITransport(app=StreamSafeGZipMiddleware(app, minimum_size=500))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        headers = {"Accept-Encoding": "gzip"}
+        for path in ("/messages/events", "/observe/events"):
+            resp = await c.get(path, headers=headers)
+            assert "content-encoding" not in resp.headers
+        resp = await c.get("/observe", headers=headers)
+        assert resp.headers["content-encoding"] == "gzip"
@@ -24,6 +24,21 @@ async def test_observe_returns_html(client, registered_agent):
     assert "Conversations" in resp.text
 
 
+@pytest.mark.asyncio
+async def test_observe_unchanged_page_is_304(client, registered_agent):
+    """A reload with the page's ETag gets 304 until the page changes."""
+    key = registered_agent["api_key"]
+    resp = await client.get(f"/observe?token={key}")
+    etag = resp.headers["etag"]
+
+    resp = await client.get(f"/observe?token={key}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+    resp = await client.get(f"/observe?token={key}&section=browse", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_observe_invalid_token(client):
     """GET /observe with bad token returns 401."""
@@ -67,6 +82,110 @@ async def test_observe_shows_messages(client, registered_agent, second_agent):
     assert "Sam&#x27;s Agent" in resp.text  # HTML-escaped apostrophe
 
 
+@pytest.mark.asyncio
+async def test_observe_events_fire_on_new_message(client, registered_agent, second_agent):
+    """An open dashboard gets a 'change' event when a message for its human arrives."""
+    import asyncio
+    from src.app.routers.observe import _observe_event_stream
+
+    key_a = registered_agent["api_key"]
+    invite_resp = await client.post("/connections/invite", headers=auth_header(key_a))
+    await client.post(
+        "/connections/accept",
+        json={"invite_code": invite_resp.json()["invite_code"]},
+        headers=auth_header(second_agent["api_key"]),
+    )
+
+    # The test transport buffers whole responses, so drive the generator directly
+    events = _observe_event_stream(second_agent["user_id"])
+    frame = asyncio.ensure_future(events.__anext__())
+    try:
+        await asyncio.sleep(0)
+        assert not frame.done()
+        await client.post(
+            "/messages",
+            json={"to_agent_id": second_agent["agent_id"], "content": "Wake up"},
+            headers=auth_header(key_a),
+        )
+        assert await asyncio.wait_for(frame, 1) == b"event: change\ndata: {}\n\n"
+    finally:
+        await events.aclose()
+
+
+@pytest.mark.asyncio
+async def test_observe_events_fire_on_delivery_and_read(client, registered_agent, second_agent):
+    """The sender's dashboard hears when its message is delivered and then read."""
+    import asyncio
+    from src.app.routers.observe import _observe_event_stream
+
+    key_a = registered_agent["api_key"]
+    key_b = second_agent["api_key"]
+    invite_resp = await client.post("/connections/invite", headers=auth_header(key_a))
+    await client.post(
+        "/connections/accept",
+        json={"invite_code": invite_resp.json()["invite_code"]},
+        headers=auth_header(key_b),
+    )
+    await client.post(
+        "/messages",
+        json={"to_agent_id": second_agent["agent_id"], "content": "Ping"},
+        headers=auth_header(key_a),
+    )
+
+    events = _observe_event_stream(registered_agent["user_id"])
+    try:
+        frame = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0)
+        inbox = await client.get("/messages/inbox", headers=auth_header(key_b))
+        assert await asyncio.wait_for(frame, 1) == b"event: change\ndata: {}\n\n"
+
+        frame = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0)
+        message_id = inbox.json()["messages"][0]["id"]
+        await client.post(f"/messages/{message_id}/ack", headers=auth_header(key_b))
+        assert await asyncio.wait_for(frame, 1) == b"event: change\ndata: {}\n\n"
+    finally:
+        await events.aclose()
+
+
+@pytest.mark.asyncio
+async def test_observe_events_need_auth(client):
+    """/observe/events without credentials is a 401."""
+    resp = await client.get("/observe/events")
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_observe_shows_every_thread(client, registered_agent, second_agent):
+    """Each thread on a connection shows its own messages."""
+    key_a = registered_agent["api_key"]
+    key_b = second_agent["api_key"]
+    invite_resp = await client.post("/connections/invite", headers=auth_header(key_a))
+    await client.post(
+        "/connections/accept",
+        json={"invite_code": invite_resp.json()["invite_code"]},
+        headers=auth_header(key_b),
+    )
+
+    for subject, content in [("Lunch", "Tacos?"), ("Trip", "Flights booked")]:
+        await client.post(
+            "/messages",
+            json={
+                "to_agent_id": second_agent["agent_id"],
+                "content": content,
+                "message_type": "query",
+                "category": "schedule",
+                "thread_subject": subject,
+            },
+            headers=auth_header(key_a),
+        )
+
+    resp = await client.get(f"/observe?token={key_a}&section=conversations")
+    assert resp.status_code == 200
+    for text in ["Lunch", "Tacos?", "Trip", "Flights booked"]:
+        assert text in resp.text
+
+
 # --- Observer login flow ---
 
 
@@ -80,6 +199,44 @@ async def test_observe_no_auth_shows_login_form(client):
     assert 'name="email"' in resp.text
 
 
+@pytest.mark.asyncio
+async def test_observe_login_css_is_linked_and_cached(client):
+    """The login page links its stylesheet, which is served with a long cache lifetime."""
+    resp = await client.get("/observe")
+    assert "<style>" not in resp.text
+    css_url = resp.text.split('<link rel="stylesheet" href="')[1].split('"')[0]
+    assert css_url.startswith("/observe/login.css?v=")
+
+    resp = await client.get(css_url)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/css")
+    assert "immutable" in resp.headers["cache-control"]
+    assert ".login-box" in resp.text
+
+
+@pytest.mark.asyncio
+async def test_observe_dashboard_css_is_linked_and_cached(client, registered_agent):
+    """The dashboard links its stylesheet instead of inlining it."""
+    resp = await client.get(f"/observe?token={registered_agent['api_key']}")
+    assert "<style>" not in resp.text
+    css_url = resp.text.split('<link rel="stylesheet" href="')[1].split('"')[0]
+    assert css_url.startswith("/observe/dashboard.css?v=")
+
+    resp = await client.get(css_url)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/css")
+    assert "immutable" in resp.headers["cache-control"]
+    assert ".sidebar" in resp.text
+
+
+@pytest.mark.asyncio
+async def test_observe_html_is_gzipped(client):
+    """Pages go out gzip-compressed to clients that accept it."""
+    resp = await client.get("/observe", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "Sign in" in resp.text
+
+
 @pytest.mark.asyncio
 async def test_observe_login_sends_code(client, registered_agent):
     """POST /observe/login sends a verification code and shows code form."""
@@ -95,6 +252,49 @@ async def test_observe_login_sends_code(client, registered_agent):
     assert "Dev mode" in resp.text
 
 
+@pytest.mark.asyncio
+async def test_observe_login_resend_is_rate_limited(client, registered_agent):
+    """A second code request for the same email within a minute sends nothing new."""
+    resp = await client.post("/observe/login", data={"email": "mikey@test.com"})
+    assert resp.status_code == 200
+
+    resp = await client.post("/observe/login", data={"email": "mikey@test.com"})
+    assert resp.status_code == 429
+    assert 'name="code"' in resp.text
+    assert "Dev mode" not in resp.text
+
+
+@pytest.mark.asyncio
+async def test_observe_login_failed_email_can_be_resent(client, registered_agent):
+    """If the code email fails to send, resubmitting sends a new one instead of a 429."""
+    from unittest.mock import AsyncMock, patch
+
+    with patch(
+        "src.app.routers.observe.send_verification_email", AsyncMock(return_value=False)
+    ) as mock_send:
+        resp = await client.post("/observe/login", data={"email": "mikey@test.com"})
+        assert resp.status_code == 200
+        mock_send.assert_awaited_once()
+
+    resp = await client.post("/observe/login", data={"email": "mikey@test.com"})
+    assert resp.status_code == 200
+    assert "Dev mode" in resp.text
+
+
+@pytest.mark.asyncio
+async def test_observe_register_failed_email_can_be_resent(client):
+    """Same for sign-up: a failed send doesn't start the resend window."""
+    from unittest.mock import AsyncMock, patch
+
+    form = {"name": "New Person", "email": "new@test.com"}
+    with patch("src.app.routers.observe.send_verification_email", AsyncMock(return_value=False)):
+        resp = await client.post("/observe/register", data=form)
+        assert resp.status_code == 200
+
+    resp = await client.post("/observe/register", data=form)
+    assert resp.status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_observe_login_unknown_email_shows_register(client):
     """POST /observe/login with unknown email shows the registration form."""
@@ -370,6 +570,19 @@ async def test_observe_profile_update(client):
     assert "Updated bio" in resp.text
 
 
+@pytest.mark.asyncio
+async def test_observe_profile_update_replaces_cached_page(client):
+    """Saving the profile drops the recently rendered page, so the reload shows the edit."""
+    jwt = await _surge_login(client, "Cached User", "cached@test.com")
+    client.cookies.set("botjoin_jwt", jwt)
+    resp = await client.get("/observe?section=profile")
+    assert "Test bio" in resp.text
+
+    await client.post("/observe/profile", data={"bio": "Fresh bio"})
+    resp = await client.get("/observe?section=profile")
+    assert "Fresh bio" in resp.text
+
+
 @pytest.mark.asyncio
 async def test_observe_browse_section(client):
     """Browse section shows discoverable profiles."""
@@ -411,6 +624,14 @@ async def test_observe_inbox_with_outreach(client, registered_agent):
     assert resp.status_code == 200
     assert "Hi! Want to collaborate?" in resp.text
     assert "Mikey" in resp.text  # From agent's human
+    assert "feed-item feed-unread" in resp.text
+    assert '<span class="nav-badge">1</span>' in resp.text
+
+    # Viewing the inbox marked it read
+    resp = await client.get("/observe?section=inbox")
+    assert "Hi! Want to collaborate?" in resp.text
+    assert "feed-item feed-unread" not in resp.text
+    assert "nav-badge" not in resp.text.split("<body>")[1]
 
 
 @pytest.mark.asyncio
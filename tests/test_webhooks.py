@@ -8,7 +8,12 @@ Covers:
 - Message to agent with webhook → POST fires (mocked)
 - Webhook failure doesn't break message delivery
 - Agent without webhook → message still in inbox
+- Worker pool queues deliveries and retries server errors
+- Circuit breaker stops calling a host that keeps failing
+- Large payloads are gzipped, only for agents that opted in
 """
+import json
+
 import pytest
 from unittest.mock import AsyncMock, patch
 
@@ -128,7 +133,7 @@ async def test_webhook_fires_on_message(client, connected_with_webhook):
     agent_a, agent_b, _ = connected_with_webhook
 
     # Mock the webhook delivery function
-    with patch("src.app.routers.messages._deliver_webhook") as mock_deliver:
+    with patch("src.app.routers.messages.deliver_webhook") as mock_deliver:
         resp = await client.post(
             "/messages",
             json={
@@ -162,7 +167,7 @@ async def test_no_webhook_when_url_not_set(client, registered_agent, second_agen
     )
 
     # Send a message — no webhook should fire
-    with patch("src.app.routers.messages._deliver_webhook") as mock_deliver:
+    with patch("src.app.routers.messages.deliver_webhook") as mock_deliver:
         resp = await client.post(
             "/messages",
             json={
@@ -189,13 +194,13 @@ async def test_webhook_failure_doesnt_break_delivery(client, connected_with_webh
     agent_a, agent_b, _ = connected_with_webhook
 
     # Mock httpx.AsyncClient to raise an exception during the webhook POST.
-    # The _deliver_webhook function catches this internally and logs a warning.
+    # deliver_webhook catches this internally and logs a warning.
     mock_client = AsyncMock()
     mock_client.__aenter__ = AsyncMock(return_value=mock_client)
     mock_client.__aexit__ = AsyncMock(return_value=False)
     mock_client.post = AsyncMock(side_effect=Exception("Connection refused"))
 
-    with patch("src.app.routers.messages.httpx.AsyncClient", return_value=mock_client):
+    with patch("src.app.webhooks.httpx.AsyncClient", return_value=mock_client):
         resp = await client.post(
             "/messages",
             json={
@@ -214,3 +219,151 @@ async def test_webhook_failure_doesnt_break_delivery(client, connected_with_webh
     )
     assert resp.status_code == 200
     assert resp.json()["count"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_webhook_queued_to_worker_pool(client, connected_with_webhook):
+    """When the worker pool is running, sends are queued for it and delivered."""
+    from src.app import webhooks
+
+    agent_a, agent_b, _ = connected_with_webhook
+
+    await webhooks.start_webhook_workers()
+    try:
+        with patch.object(webhooks._client, "post", new_callable=AsyncMock) as mock_post:
+            mock_post.return_value.status_code = 200
+            resp = await client.post(
+                "/messages",
+                json={
+                    "to_agent_id": agent_b["agent_id"],
+                    "content": "Through the pool",
+                },
+                headers=auth_header(agent_a["api_key"]),
+            )
+            assert resp.status_code == 200
+            await webhooks._queue.join()
+
+        mock_post.assert_awaited_once()
+        assert mock_post.await_args.args[0] == "https://agent-b.example.com/webhook"
+        body = json.loads(mock_post.await_args.kwargs["content"])
+        assert body["content"] == "Through the pool"
+    finally:
+        await webhooks.stop_webhook_workers()
+
+
+@pytest.mark.asyncio
+async def test_webhook_retries_on_server_error(client, connected_with_webhook):
+    """A 5xx from the receiver schedules a retry instead of giving up."""
+    from src.app import webhooks
+
+    agent_a, agent_b, _ = connected_with_webhook
+
+    await webhooks.start_webhook_workers()
+    try:
+        with patch.object(webhooks._client, "post", new_callable=AsyncMock) as mock_post, \
+                patch("src.app.webhooks._schedule_retry") as mock_retry:
+            mock_post.return_value.status_code = 503
+            await client.post(
+                "/messages",
+                json={"to_agent_id": agent_b["agent_id"], "content": "Try again"},
+                headers=auth_header(agent_a["api_key"]),
+            )
+            await webhooks._queue.join()
+
+        mock_retry.assert_called_once()
+        (url, payload, compress, attempt), delay = mock_retry.call_args.args
+        assert attempt == 2
+        # 2s backoff plus up to 1s of jitter
+        assert 2 <= delay < 3
+    finally:
+        await webhooks.stop_webhook_workers()
+
+
+@pytest.mark.asyncio
+async def test_webhook_circuit_opens_after_repeated_failures():
+    """After BREAKER_THRESHOLD failures in a row, deliveries to that host are skipped."""
+    from src.app import webhooks
+
+    await webhooks.start_webhook_workers()
+    try:
+        with patch.object(webhooks._client, "post", new_callable=AsyncMock) as mock_post, \
+                patch("src.app.webhooks._schedule_retry"):
+            mock_post.return_value.status_code = 503
+            for _ in range(webhooks.BREAKER_THRESHOLD + 3):
+                webhooks.enqueue_webhook("https://down.example.com/hook", b"{}")
+            await webhooks._queue.join()
+
+            # Only the first BREAKER_THRESHOLD deliveries reached the network
+            assert mock_post.await_count == webhooks.BREAKER_THRESHOLD
+
+            # Other hosts are unaffected
+            mock_post.return_value.status_code = 200
+            webhooks.enqueue_webhook("https://up.example.com/hook", b"{}")
+            await webhooks._queue.join()
+            assert mock_post.await_count == webhooks.BREAKER_THRESHOLD + 1
+    finally:
+        await webhooks.stop_webhook_workers()
+
+
+@pytest.mark.asyncio
+async def test_large_webhook_payload_gzipped():
+    """With compress set, payloads over WEBHOOK_GZIP_MIN_BYTES go out gzipped; small ones don't."""
+    import gzip
+    from src.app import webhooks
+
+    big = json.dumps({"content": "x" * 5000}).encode()
+    small = b'{"content": "hi"}'
+
+    await webhooks.start_webhook_workers()
+    try:
+        with patch.object(webhooks._client, "post", new_callable=AsyncMock) as mock_post:
+            mock_post.return_value.status_code = 200
+
+            await webhooks.deliver_webhook("https://example.com/hook", big, compress=True)
+            kwargs = mock_post.await_args.kwargs
+            assert kwargs["headers"]["Content-Encoding"] == "gzip"
+            assert gzip.decompress(kwargs["content"]) == big
+
+            await webhooks.deliver_webhook("https://example.com/hook", small, compress=True)
+            kwargs = mock_post.await_args.kwargs
+            assert "Content-Encoding" not in kwargs["headers"]
+            assert kwargs["content"] == small
+    finally:
+        await webhooks.stop_webhook_workers()
+
+
+@pytest.mark.asyncio
+async def test_webhook_gzip_is_opt_in(client, connected_with_webhook):
+    """Large deliveries stay uncompressed until the agent sets webhook_gzip."""
+    from src.app import webhooks
+
+    agent_a, agent_b, _ = connected_with_webhook
+    big = "x" * 5000
+
+    await webhooks.start_webhook_workers()
+    try:
+        with patch.object(webhooks._client, "post", new_callable=AsyncMock) as mock_post:
+            mock_post.return_value.status_code = 200
+            await client.post(
+                "/messages",
+                json={"to_agent_id": agent_b["agent_id"], "content": big},
+                headers=auth_header(agent_a["api_key"]),
+            )
+            await webhooks._queue.join()
+            assert "Content-Encoding" not in mock_post.await_args.kwargs["headers"]
+
+            resp = await client.put(
+                "/auth/me",
+                json={"webhook_gzip": True},
+                headers=auth_header(agent_b["api_key"]),
+            )
+            assert resp.json()["webhook_gzip"] is True
+            await client.post(
+                "/messages",
+                json={"to_agent_id": agent_b["agent_id"], "content": big},
+                headers=auth_header(agent_a["api_key"]),
+            )
+            await webhooks._queue.join()
+            assert mock_post.await_args.kwargs["headers"]["Content-Encoding"] == "gzip"
+    finally:
+        await webhooks.stop_webhook_workers()